@@ -0,0 +1,139 @@
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import time
+
+# Make the project's packages importable when this file is run directly
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer.lolcode_lexer import *
+from parser.lolcode_parser import *
+from interpreter.lolcode_interpreter import *
+from interpreter.values import *
+from common import globals
+from benchmark.program_generator import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# FRONT-END SCALING BENCHMARK
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Times lolcode_lex, Parser.parse and Interpreter.visit separately on generated programs of growing
+# size, and prints one scaling curve per program shape.
+# The 'growth' column is the exponent k of time ~ size^k between a size and the previous one:
+# about 1 is linear, and anything well above it (see SUPER_LINEAR) is flagged, since the work done
+# for these programs should only grow linearly with their size.
+# Run from the project's root directory with: python3 -m benchmark.front_end_benchmark
+
+DEFAULT_SIZES = [250, 500, 1000, 2000, 4000]
+STAGES = ('lex', 'parse', 'interpret')
+SUPER_LINEAR = 1.3
+
+# Function to time the stages of the front end on a program
+# Returns a dict of stage to the best time (in seconds) out of repeat runs, or to the name of the
+# error that stopped the stage (ex. a RecursionError for deeply nested expressions).
+def time_stages(characters, repeat=3):
+    timings = {}
+    stage_times = {stage: [] for stage in STAGES}
+
+    for _ in range(repeat):
+        # Lexer
+        try:
+            start = time.perf_counter()
+            tokens = lolcode_lex(characters)
+            stage_times['lex'].append(time.perf_counter() - start)
+        except (LexError, RecursionError) as error:
+            timings['lex'] = type(error).__name__
+            break
+
+        # Parser
+        try:
+            start = time.perf_counter()
+            ast = Parser(tokens).parse()
+            stage_times['parse'].append(time.perf_counter() - start)
+        except RecursionError as error:
+            timings['parse'] = type(error).__name__
+            break
+        if ast.error:
+            timings['parse'] = ast.error.error_name
+            break
+
+        # Interpreter (with a fresh symbol table every run, and without printing the program's output)
+        globals.symbol_table = SymbolTable()
+        globals.symbol_table.set("IT", Number(0))
+        context = Context('<program>')
+        context.symbol_table = globals.symbol_table
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = Interpreter().visit(ast.node, context)
+                stage_times['interpret'].append(time.perf_counter() - start)
+        except RecursionError as error:
+            timings['interpret'] = type(error).__name__
+            break
+        if result.error:
+            timings['interpret'] = result.error.error_name
+            break
+
+    for stage in STAGES:
+        if stage not in timings and stage_times[stage]:
+            timings[stage] = min(stage_times[stage])
+    return timings
+
+# Function to get the growth exponent between two (size, time) points
+def growth(previous_size, previous_time, size, time_taken):
+    if not isinstance(previous_time, float) or not isinstance(time_taken, float) or previous_time <= 0 or time_taken <= 0:
+        return None
+    return math.log(time_taken / previous_time) / math.log(size / previous_size)
+
+# Function to run the benchmark and print the scaling curves
+# Returns the list of (shape, stage, size, growth) that were flagged as super-linear.
+def run_benchmark(shapes, sizes, repeat=3, output=sys.stdout):
+    globals.no_gui = True  # Terminal-based interpreter
+    flagged = []
+
+    for shape in shapes:
+        print(f"\n{shape}", file=output)
+        print(f"{'size':>8} {'chars':>10} {'tokens':>8}" + ''.join(f" {stage + ' (ms)':>16} {'growth':>7}" for stage in STAGES), file=output)
+
+        previous = None
+        for size in sizes:
+            characters = generate_program(shape, size)
+            try:
+                token_count = len(lolcode_lex(characters))
+            except LexError:
+                token_count = 0
+            timings = time_stages(characters, repeat)
+
+            row = f"{size:>8} {len(characters):>10} {token_count:>8}"
+            for stage in STAGES:
+                time_taken = timings.get(stage, '-')
+                stage_growth = growth(previous[0], previous[1].get(stage), size, time_taken) if previous else None
+                flag = ''
+                if stage_growth is not None and stage_growth > SUPER_LINEAR:
+                    flag = '!'
+                    flagged.append((shape, stage, size, stage_growth))
+
+                time_text = f"{time_taken * 1000:.2f}" if isinstance(time_taken, float) else time_taken
+                growth_text = f"{stage_growth:.2f}{flag}" if stage_growth is not None else ''
+                row += f" {time_text:>16} {growth_text:>7}"
+            print(row, file=output)
+
+            previous = (size, timings)
+
+    if flagged:
+        print("\nSuper-linear stages (growth > %.1f):" % SUPER_LINEAR, file=output)
+        for shape, stage, size, stage_growth in flagged:
+            print(f"  {shape}: {stage} at size {size} (growth {stage_growth:.2f})", file=output)
+    return flagged
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Benchmark the LOLCODE front end on generated programs of growing size.')
+    argument_parser.add_argument('--shapes', nargs='+', choices=list(SHAPES), default=list(SHAPES), help='program shapes to generate')
+    argument_parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='program sizes (number of repeated units of the shape)')
+    argument_parser.add_argument('--repeat', type=int, default=3, help='runs per stage (the best time is kept)')
+    arguments = argument_parser.parse_args()
+
+    run_benchmark(arguments.shapes, sorted(arguments.sizes), arguments.repeat)
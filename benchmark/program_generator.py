@@ -0,0 +1,92 @@
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# SYNTHETIC PROGRAM GENERATOR
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Functions for generating valid LOLCODE programs of a configurable size and shape, to stress one
+# part of the front end at a time. size is the number of repeated units of the shape (nesting levels,
+# operands, declarations, functions, cases, ...), so the work done for a program should grow
+# linearly with it.
+
+# Wrap the body of a program with 'HAI' and 'KTHXBYE' (and a variable section if there's one)
+def program(body, declarations=()):
+    lines = ['HAI']
+    if declarations:
+        lines.append('    WAZZUP')
+        lines.extend(f'        {declaration}' for declaration in declarations)
+        lines.append('    BUHBYE')
+    lines.extend(f'    {line}' for line in body)
+    lines.append('KTHXBYE')
+    return '\n'.join(lines) + '\n'
+
+# One deeply nested arithmetic expression (ex. SUM OF SUM OF 1 AN 1 AN 1)
+def nested_sum_program(size):
+    expression = 'SUM OF ' * size + '1' + ' AN 1' * size
+    return program([f'x R {expression}', 'VISIBLE x'], ['I HAS A x'])
+
+# One long string concatenation (SMOOSH "a0" AN "a1" AN ...)
+def smoosh_program(size):
+    operands = ' AN '.join(f'"a{index}"' for index in range(size))
+    return program([f'VISIBLE SMOOSH {operands}'])
+
+# A variable section with many declarations
+def wazzup_program(size):
+    declarations = [f'I HAS A var{index} ITZ {index}' for index in range(size)]
+    return program([f'VISIBLE var{size - 1}'], declarations)
+
+# Many function definitions, each called once
+def functions_program(size):
+    body = []
+    for index in range(size):
+        body.extend([
+            f'HOW IZ I add{index} YR x',
+            f'    FOUND YR SUM OF x AN {index}',
+            'IF U SAY SO',
+        ])
+    for index in range(size):
+        body.extend([f'I IZ add{index} YR {index} MKAY', 'VISIBLE IT'])
+    return program(body)
+
+# One switch-case statement with many cases (the last one matches)
+def switch_program(size):
+    body = ['choice', 'WTF?']
+    for index in range(size):
+        body.extend([f'    OMG {index}', f'        VISIBLE "case {index}"', '        GTFO'])
+    body.extend(['    OMGWTF', '        VISIBLE "default"', 'OIC'])
+    return program(body, [f'I HAS A choice ITZ {size - 1}'])
+
+# A bit of everything: declarations, expressions, comments, conditions and loops
+def mixed_program(size):
+    declarations = ['I HAS A total ITZ 0', 'I HAS A counter ITZ 0']
+    body = []
+    for index in range(size):
+        body.extend([
+            f'BTW block {index}',
+            f'total R SUM OF total AN PRODUKT OF {index} AN 2',
+            f'BOTH SAEM total AN BIGGR OF total AN {index}',
+            'O RLY?',
+            '    YA RLY',
+            f'        VISIBLE "block {index}: " + total',
+            '    NO WAI',
+            '        VISIBLE "smaller"',
+            'OIC',
+            f'IM IN YR loop{index} UPPIN YR counter TIL BOTH SAEM counter AN 3',
+            '    VISIBLE SMOOSH "counter " AN counter',
+            f'IM OUTTA YR loop{index}',
+            'counter R 0',
+        ])
+    return program(body, declarations)
+
+# Generators by shape name
+SHAPES = {
+    'nested_sum': nested_sum_program,
+    'smoosh': smoosh_program,
+    'wazzup': wazzup_program,
+    'functions': functions_program,
+    'switch': switch_program,
+    'mixed': mixed_program,
+}
+
+# Function to generate a program of a certain shape and size
+def generate_program(shape, size):
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown program shape '{shape}' (expected one of: {', '.join(SHAPES)})")
+    return SHAPES[shape](size)
@@ -1,4 +1,6 @@
 no_gui = True        # Flag to disable GUI features
 
 symbol_table = None  # Storage for variables and functions and their values
-tokens = None  # Storage for tokens (list of tuples with token, tag, and line number)
+tokens = None  # Storage for tokens (TokenStream of the last program; see lexer/token_stream.py)
+parse_cache = None  # Cache of the parsed programs used by run_lolcode (ParseCache, or None to always lex and parse; see parser/parse_cache.py)
+optimizer = None  # Passes run on the AST by run_lolcode_ast (Optimizer, or None to run the AST as parsed; see optimizer/lolcode_optimizer.py)
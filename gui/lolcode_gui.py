@@ -8,6 +8,8 @@ import sys
 # Add the project root directory to Python path (to use globals.py when running just this gui)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common import globals
+from lexer.lolcode_lexer import TAG_NAMES
+from parser.incremental import IncrementalFrontEnd
 
 # Declare important variables in which most functions will operate
 root = None
@@ -108,8 +110,13 @@ class CodeEditor(tk.Frame):
                 arrowcolor=[('active', _DARK_ACCENT), ('pressed', _DARK_ACCENT)],
             )
 
+        # Front end that keeps the tokens and AST of the code up to date while it's edited
+        self.frontEnd = IncrementalFrontEnd()
+        self.frontEndUpdate = None
+
         # Bind events
         self.textWidget.bind('<Key>', self.on_content_changed)
+        self.textWidget.bind('<<Modified>>', self.on_modified)
         self.textWidget.bind('<Button-1>', self.on_left_click)
         self.textWidget.bind('<MouseWheel>', self.on_mousewheel)
         self.textWidget.bind('<Button-3>', self.show_context_menu)  # Right click
@@ -161,6 +168,21 @@ class CodeEditor(tk.Frame):
     def on_content_changed(self, event=None):
         self.after_idle(self.update_line_numbers)
     
+    # Handle modifications of the code (typing, pasting, opening a file, ...)
+    def on_modified(self, event=None):
+        self.textWidget.edit_modified(False)    # So the next modification is reported too
+
+        # Lex and parse the changes once the editor is idle, so the AST is ready when the code is executed
+        if self.frontEndUpdate is None:
+            self.frontEndUpdate = self.after_idle(self.update_front_end)
+
+    # Update the tokens and AST of the code (errors are only reported when the code is executed)
+    def update_front_end(self):
+        self.frontEndUpdate = None
+        code = self.get("1.0", "end-1c")
+        if code.strip():
+            self.frontEnd.update(code)
+
     # Update line numbers display
     def update_line_numbers(self):
         # Get current number of lines in text widget
@@ -458,9 +480,10 @@ def execute_code(codeEditor, console, lexemeTree, symbolTree):
 
     # Run the LOLCODE interpreter
     from lolcode import handle_run_lolcode
-    handle_run_lolcode(code)
+    handle_run_lolcode(code, codeEditor.frontEnd)   # Only the changes since the last update are lexed and parsed
 
-    update_table_contents(lexemeTree, globals.tokens)  # Update lexeme table with tokens
+    lexemes = globals.tokens.as_tuples(TAG_NAMES) if globals.tokens is not None else []    # No tokens if the lexer failed
+    update_table_contents(lexemeTree, lexemes)  # Update lexeme table with tokens
     update_table_contents(symbolTree, globals.symbol_table.symbols.items())  # Update symbol table with variables and functions
 
 # ───────────────────────────────────────────────────────────────────────────────────────────────
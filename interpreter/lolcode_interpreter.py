@@ -22,28 +22,28 @@ class Interpreter:
   def visit_IntegerNode(self, node, context):
     # print("Found integer node")
     return RTResult().success(
-      Number(int(node.token[TOKEN_VALUE]), node.token[TOKEN_LINE_NUMBER])
+      Number(node.value, node.line_number)
     )
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_FloatNode(self, node, context):
     # print("Found float node")
     return RTResult().success(
-      Number(float(node.token[TOKEN_VALUE]), node.token[TOKEN_LINE_NUMBER])
+      Number(node.value, node.line_number)
     )
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_BooleanNode(self, node, context):
     # print("Found boolean node")
     return RTResult().success(
-      Boolean(node.token[TOKEN_VALUE], node.token[TOKEN_LINE_NUMBER])
+      Boolean(node.value, node.line_number)
     )
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_StringNode(self, node, context):
     # print("Found string node")
     return RTResult().success(
-      String(node.token[TOKEN_VALUE], node.token[TOKEN_LINE_NUMBER])
+      String(node.value, node.line_number)
     )
   
   # ───────────────────────────────────────────────────────────────────────────────────────────────
@@ -52,6 +52,41 @@ class Interpreter:
       Noob(node.line_number)
     )    
   
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Expression evaluated by the optimizer (see ConstantNode)
+  def visit_ConstantNode(self, node, context):
+    value = node.value
+    if not node.shared and isinstance(value, Value):
+      value = value.copy()
+    return RTResult().success(value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Expression of a loop that's only evaluated once each time the loop runs (see InvariantNode)
+  def visit_InvariantNode(self, node, context):
+    value = node.values[node.index]
+    if value is None:
+      res = self.visit(node.expression, context)
+      if res.error: return res
+      value = node.values[node.index] = res.value
+
+    if not node.shared and isinstance(value, Value):
+      value = value.copy()
+    return RTResult().success(value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Expression whose value is reused in its statement list (see CommonNode)
+  def visit_CommonNode(self, node, context):
+    if node.defining:
+      res = self.visit(node.expression, context)
+      if res.error: return res
+      value = node.values[node.index] = res.value
+    else:
+      value = node.values[node.index]
+
+    if not node.shared and isinstance(value, Value):
+      value = value.copy()
+    return RTResult().success(value)
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_ArithmeticBinaryOpNode(self, node, context):
     # print("Found ar bin op node")
@@ -61,26 +96,7 @@ class Interpreter:
     right = res.register(self.visit(node.right_node, context))
     if res.error: return res
 
-    if node.operation[TOKEN_TAG] == SUM_OF:
-      result, error = left.added_by(right)
-
-    elif node.operation[TOKEN_TAG] == DIFF_OF:
-      result, error = left.subtracted_by(right)
-    
-    elif node.operation[TOKEN_TAG] == PRODUKT_OF:
-      result, error = left.multiplied_by(right) 
-
-    elif node.operation[TOKEN_TAG] == QUOSHUNT_OF:
-      result, error = left.divided_by(right)
-
-    elif node.operation[TOKEN_TAG] == MOD_OF:
-      result, error = left.modulo(right)
-    
-    elif node.operation[TOKEN_TAG] == BIGGR_OF:
-      result, error = left.maximum(right)
-    
-    elif node.operation[TOKEN_TAG] == SMALLR_OF:
-      result, error = left.minimum(right)
+    result, error = self.ARITHMETIC_OPERATIONS[node.operator](left, right)
 
     if (error):
       return res.failure(error)
@@ -97,14 +113,7 @@ class Interpreter:
     right = res.register(self.visit(node.right_node, context))
     if res.error: return res
 
-    if node.operation[TOKEN_TAG] == BOTH_OF:
-      result, error = left.and_logic(right)
-
-    elif node.operation[TOKEN_TAG] == EITHER_OF:
-      result, error = left.or_logic(right)
-    
-    elif node.operation[TOKEN_TAG] == WON_OF:
-      result, error = left.xor_logic(right) 
+    result, error = self.BOOLEAN_OPERATIONS[node.operator](left, right)
 
     if (error): return res.failure(error)
     else: return res.success(result)
@@ -115,8 +124,7 @@ class Interpreter:
     operand_ = res.register(self.visit(node.operand, context))
     if res.error: return res
 
-    if (node.operation[TOKEN_TAG] == NOT):
-      result, error = operand_.not_logic()
+    result, error = operand_.not_logic()
 
     if (error): return res.failure(error)
     else: return res.success(result)
@@ -134,13 +142,54 @@ class Interpreter:
     # Since the boolean values in the list are still expressed in the lolcode boolean system, we need to convert each of them first to its true boolean value so we can perform the desired operation on the entire list
     boolean_results = [boolean.value for boolean in boolean_results]
 
-    if node.operation[TOKEN_TAG] == ALL_OF:
+    if node.operator == Operator.ALL_OF:
       value = Boolean(all(boolean_results))
-    elif node.operation[TOKEN_TAG] == ANY_OF:
+    elif node.operator == Operator.ANY_OF:
       value = Boolean(any(boolean_results))
 
     return res.success(value)
 
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # BOTH OF or EITHER OF that skips its right operand when the left one decides the result (see ShortCircuit)
+  def visit_ShortCircuitBinaryOpNode(self, node, context):
+    res = RTResult()
+    left = res.register(self.visit(node.left_node, context))
+    if res.error: return res
+
+    left_value, error = left.typecast(Boolean)
+    if error:
+      # The right operand is still evaluated first (its errors come before the typecast's, like in visit_BooleanBinaryOpNode)
+      res.register(self.visit(node.right_node, context))
+      if res.error: return res
+      return res.failure(error)
+
+    # FAIL decides BOTH OF, and WIN decides EITHER OF
+    if left_value.value == (node.operator == Operator.EITHER_OF):
+      return res.success(Boolean(left_value.value).set_context(left_value.context))
+
+    right = res.register(self.visit(node.right_node, context))
+    if res.error: return res
+
+    result, error = self.BOOLEAN_OPERATIONS[node.operator](left_value, right)
+
+    if (error): return res.failure(error)
+    else: return res.success(result)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # ALL OF or ANY OF that stops at the first operand that decides the result (see ShortCircuit)
+  def visit_ShortCircuitTernaryOpNode(self, node, context):
+    res = RTResult()
+    decisive_value = node.operator == Operator.ANY_OF   # A FAIL decides ALL OF, and a WIN decides ANY OF
+
+    for boolean_statement in node.boolean_statements:
+      boolean_result = res.register(self.visit(boolean_statement, context))
+      if res.error: return res
+
+      if bool(boolean_result.value) == decisive_value:
+        return res.success(Boolean(decisive_value))
+
+    return res.success(Boolean(not decisive_value))
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_ComparisonOpNode(self, node, context):
     # print("Found comparison op node")
@@ -150,11 +199,37 @@ class Interpreter:
     right = res.register(self.visit(node.right_node, context))
     if res.error: return res
 
-    if node.operation[TOKEN_TAG] == BOTH_SAEM:
-      result, error = left.is_equal(right)
+    result, error = self.COMPARISON_OPERATIONS[node.operator](left, right)
+
+    if (error): return res.failure(error)
+    else: return res.success(result)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # BOTH SAEM or DIFFRINT between a variable and the SMALLR OF or BIGGR OF it and another operand (see Peephole)
+  def visit_ExtremumComparisonNode(self, node, context):
+    res = RTResult()
+    value = res.register(self.visit(node.variable_node, context))
+    if res.error: return res
+    other = res.register(self.visit(node.other_node, context))
+    if res.error: return res
+
+    # Compare the NUMBRs and NUMBARs directly
+    if type(value) is Number and type(other) is Number:
+      if node.extremum_operator == Operator.SMALLR_OF:
+        extremum = min(value.value, other.value)
+      else:
+        extremum = max(value.value, other.value)
+      result = (value.value == extremum) == (node.operator == Operator.BOTH_SAEM)
+      return res.success(Boolean(result).set_context(value.context))
 
-    elif node.operation[TOKEN_TAG] == DIFFRINT:
-      result, error = left.is_not_equal(right)
+    # Other types are typecast like in the operations that were rewritten
+    extremum, error = self.ARITHMETIC_OPERATIONS[node.extremum_operator](value, other)
+    if error: return res.failure(error)
+
+    if node.variable_first:
+      result, error = self.COMPARISON_OPERATIONS[node.operator](value, extremum)
+    else:
+      result, error = self.COMPARISON_OPERATIONS[node.operator](extremum, value)
 
     if (error): return res.failure(error)
     else: return res.success(result)
@@ -307,6 +382,34 @@ class Interpreter:
 
     return res.success(basis)
 
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # WTF? that looks up its case in a table instead of comparing IT to each case (see SwitchTables)
+  def visit_SwitchTableNode(self, node, context):
+    res = RTResult()
+    basis = context.symbol_table.get('IT')
+
+    if type(basis) not in node.case_tables:
+      return self.visit_SwitchCaseNode(node.switch_case, context)
+
+    case_indices, error_index, error = node.case_table(type(basis))
+    case_index = case_indices.get(basis.value, error_index)
+    if error and case_index == error_index: return res.failure(error)
+
+    switch_case = node.switch_case
+    if case_index < len(switch_case.cases):
+      for statement in switch_case.cases_statements[case_index]:
+        statement_value = res.register(self.visit(statement, context))
+        if res.error: return res
+
+        if isinstance(statement_value, Break):
+          break
+    else:
+      for statement in switch_case.default_case_statements:
+        statement_value = res.register(self.visit(statement, context))
+        if res.error: return res
+
+    return res.success(basis)
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_IfNode(self, node, context):
     res = RTResult()
@@ -331,7 +434,7 @@ class Interpreter:
     res = RTResult()
 
     label = node.label
-    operation = node.operation
+    operator = node.operator
     variable = node.variable
     clause_type = node.clause_type
     til_wile_expression = node.til_wile_expression
@@ -374,15 +477,86 @@ class Interpreter:
       # Incrementor/Decrementor
       iterator = res.register(self.visit(VarAccessNode(variable), context))
       if iterator is None: return res
-      if operation[TOKEN_TAG] == UPPIN:
+      if operator == Operator.UPPIN:
         iterator.value += 1
       else:
         iterator.value -= 1
       
-      res.register(self.visit(VarAssignmentNode(variable, IntegerNode((iterator.value, None, variable[TOKEN_LINE_NUMBER]))), context))
+      res.register(self.visit(VarAssignmentNode(variable, IntegerNode(int(iterator.value), variable[TOKEN_LINE_NUMBER])), context))
 
     return res.success(label)
 
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Loop with invariant expressions (see LoopInvariants)
+  def visit_InvariantLoopNode(self, node, context):
+    # The loops change the values of their variables in place, so the invariants can't be kept if
+    # they read a variable with the same value as one of them (ex. after j R i)
+    loop_values = [context.symbol_table.get(name) for name in node.loop_variable_names]
+    for name in node.read_names:
+      value = context.symbol_table.get(name)
+      if any(value is loop_value for loop_value in loop_values):
+        return self.visit(node.loop, context)
+
+    node.values[:] = [None] * len(node.values)
+    return self.visit(node.hoisted_loop, context)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Loop that only counts (see CountedLoops), computed at once when its values are all integer NUMBRs
+  def visit_CountedLoopNode(self, node, context):
+    res = RTResult()
+    loop = node.loop
+    variable = loop.variable
+
+    # Looking the values up has no side effects, so the loop is run as it is if they can't be used
+    # (a lookup that fails gives None)
+    counter = self.visit(VarAccessNode(variable), context).value
+    bound = self.visit(node.bound_node, context).value
+    invariants = [bound]
+    operands = []
+    for accumulator, operator, term_node, accumulator_first in node.accumulations:
+      value = self.visit(VarAccessNode(accumulator), context).value
+      if term_node is None:
+        term = counter
+      else:
+        term = self.visit(term_node, context).value
+        invariants.append(term)
+      operands.append((value, term))
+
+    values = [counter] + invariants + [value for value, term in operands]
+    if not all(type(value) is Number and type(value.value) is int for value in values):
+      return self.visit_LoopNode(loop, context)
+
+    # The loop changes the value of its variable in place, so a bound or term that is the same value
+    # (ex. after n R i) would change too
+    if any(invariant is counter for invariant in invariants):
+      return self.visit_LoopNode(loop, context)
+
+    start = counter.value
+    step = 1 if loop.operator == Operator.UPPIN else -1
+    count = node.iteration_count(start, bound.value, step)
+    if count is None:
+      return self.visit_LoopNode(loop, context)   # Never ends
+    if count == 0:
+      return res.success(loop.label)
+
+    for (accumulator, operator, term_node, accumulator_first), (value, term) in zip(node.accumulations, operands):
+      result = node.accumulate(operator, value.value, None if term_node is None else term.value, start, step, count)
+
+      # Like in the operation, the result has the context of its first operand (in the last iteration)
+      if accumulator_first:
+        result_context = value.context
+      elif term_node is not None or count == 1:
+        result_context = term.context
+      else:
+        result_context = None   # A NUMBR made by the loop
+      context.symbol_table.set(accumulator[TOKEN_VALUE], Number(result).set_context(result_context))
+
+    # The first iteration changes the value in place, and each one assigns a new NUMBR
+    counter.value += step
+    context.symbol_table.set(variable[TOKEN_VALUE], Number(start + step * count, variable[TOKEN_LINE_NUMBER]))
+
+    return res.success(loop.label)
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_FuncDefNode(self, node, context):
     res = RTResult()
@@ -398,7 +572,7 @@ class Interpreter:
 
     body_statements = node.body_statements
     
-    function_value = Function(function_name, params, body_statements).set_context(context)
+    function_value = Function(function_name, params, body_statements, node.body_tokens).set_context(context)
     
     context.symbol_table.set(function_name, function_value)
     return res.success(function_value)
@@ -421,9 +595,54 @@ class Interpreter:
 
       parameters_to_pass.append(par)
 
-    return_value = function_to_call.execute(parameters_to_pass)
+    return self.call_function(function_to_call, parameters_to_pass)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Function to call a function with the values of its arguments
+  def call_function(self, function, arguments):
+    res = RTResult()
+    return_value = function.execute(arguments)
+
+    # A syntax error in the body of a lazily parsed function (see Function.parse_body()) stops the program
+    if isinstance(return_value.error, InvalidSyntaxError): return res.failure(return_value.error)
+
     return res.success(return_value.value)
 
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Call of a small function whose body is run here (see InlinedCallNode)
+  def visit_InlinedCallNode(self, node, context):
+    res = RTResult()
+    call = node.call
+
+    function = res.register(self.visit(call.function_name, context))
+    if res.error: return res
+
+    arguments = []
+    for parameter in call.parameters:
+      argument = res.register(self.visit(parameter, context))
+      if res.error: return res
+      arguments.append(argument)
+
+    # Another function, or an argument that the function's symbol table wouldn't keep as it is
+    if type(function) is not Function or function.body_statements is not node.function_body:
+      return self.call_function(function, arguments)
+    if not all(type(argument) in self.INLINED_ARGUMENT_TYPES for argument in arguments):
+      return self.call_function(function, arguments)
+
+    node.values[:] = arguments
+    value = None
+    for statement in node.body_statements:
+      statement_res = self.visit(statement, context)
+      if statement_res.error: return res.success(None)    # The errors of a function are ignored
+      value = statement_res.value
+
+    return res.success(value)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Argument of an inlined call (see ParameterNode)
+  def visit_ParameterNode(self, node, context):
+    return RTResult().success(node.values[node.index])
+
   # ───────────────────────────────────────────────────────────────────────────────────────────────
   def visit_InputNode(self, node, context):
     from common import globals
@@ -441,13 +660,11 @@ class Interpreter:
     # Otherwise, we'll use a tkinter popup window to get user input
       if globals.no_gui:
         user_input_value = str(input())
-        user_input_value = " " + user_input_value + " "
       else:
         user_input_value = get_user_input()
         print(user_input_value)
-        user_input_value = " " + user_input_value + " "
 
-      user_input = StringNode((user_input_value, None, variable.var_name_token[TOKEN_LINE_NUMBER]))
+      user_input = StringNode(user_input_value, variable.var_name_token[TOKEN_LINE_NUMBER])
 
       # Assign the user input to the variable in the symbol table
       value = res.register(self.visit(VarAssignmentNode(variable.var_name_token, user_input), context))
@@ -474,3 +691,31 @@ class Interpreter:
         if res.error: return res
     return res.success(None)
 
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPERATION TABLES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+  # Value methods by operator (the operators are decoded by the parser, see Operator)
+  ARITHMETIC_OPERATIONS = {
+    Operator.SUM_OF: Value.added_by,
+    Operator.DIFF_OF: Value.subtracted_by,
+    Operator.PRODUKT_OF: Value.multiplied_by,
+    Operator.QUOSHUNT_OF: Value.divided_by,
+    Operator.MOD_OF: Value.modulo,
+    Operator.BIGGR_OF: Value.maximum,
+    Operator.SMALLR_OF: Value.minimum,
+  }
+
+  BOOLEAN_OPERATIONS = {
+    Operator.BOTH_OF: Value.and_logic,
+    Operator.EITHER_OF: Value.or_logic,
+    Operator.WON_OF: Value.xor_logic,
+  }
+
+  COMPARISON_OPERATIONS = {
+    Operator.BOTH_SAEM: Value.is_equal,
+    Operator.DIFFRINT: Value.is_not_equal,
+  }
+
+  # Values that an inlined call passes to the body as they are (a Function's context is changed by a
+  # call, and a missing value is looked up in the symbol table of the function's parent)
+  INLINED_ARGUMENT_TYPES = (Number, String, Boolean, Noob)
@@ -15,6 +15,12 @@ class Value:
     self.context = context
     return self
 
+  # Copy of the value (ex. of a value evaluated by the optimizer, see ConstantNode)
+  def copy(self):
+    value = object.__new__(self.__class__)
+    value.__dict__.update(self.__dict__)
+    return value
+
   # Typecasting method (to be implemented in subclasses)
   def typecast(self, target_class):
     raise NotImplementedError("Subclasses must implement this method")
@@ -405,17 +411,36 @@ class Boolean(Value):
     return str(self.get_value_representation())
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+# If the function was parsed lazily, its body_statements are None and its body_tokens are parsed on
+# the first call (and kept for the next ones)
 class Function(Value):
-  def __init__(self, function_name, parameters, body_statements):
+  def __init__(self, function_name, parameters, body_statements, body_tokens=None):
     self.function_name = function_name
     self.parameters = parameters
     self.body_statements = body_statements
+    self.body_tokens = body_tokens
     super().__init__()
 
+  def parse_body(self):
+    from parser.lolcode_parser import Parser
+    from common import globals
+
+    self.body_statements = Parser(self.body_tokens, lazy_functions=True).parse_function_body()
+    if globals.optimizer is not None:
+      self.body_statements = globals.optimizer.optimize(self.body_statements)
+    self.body_tokens = None
+
   def execute(self, passed_parameters):
     from .lolcode_interpreter import Interpreter
 
     res = RTResult()
+
+    if self.body_statements is None:
+      try:
+        self.parse_body()
+      except ParseError as error:
+        return res.failure(error.error)
+
     interpreter = Interpreter()
     new_context = Context(self.function_name, parent=self.context)
     new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
@@ -0,0 +1,14 @@
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# LEXER ERRORS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Error raised by the lexer on an illegal character or a misplaced multi-line comment keyword.
+# It has the same as_string() as the parser/runtime errors, so it can be reported the same way.
+class LexError(Exception):
+    def __init__(self, details, line_number=None):
+        super().__init__(details)
+        self.details = details
+        self.line_number = line_number
+        self.error_name = 'Lexical Error'
+
+    def as_string(self):
+        return f"{self.details}\n"
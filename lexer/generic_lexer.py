@@ -1,48 +1,328 @@
-import sys
 import re
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from .errors import *
+from .token_stream import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# TOKEN REGEX
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Function for combining a set of token patterns into one master regex.
+# Every pattern becomes a named group of a single alternation, in the same order as in token_exprs,
+# so the first pattern that matches still wins (ex. 'AN YR' is tried before 'AN').
+# If as_bytes is set, the regex is compiled for UTF-8 bytes input instead (ex. a memory-mapped file).
+# Returns the compiled regex and a list that maps each group number to the tag of its pattern.
+def compile_token_exprs(token_exprs, as_bytes=False):
+    pattern = '|'.join(f'(?P<T{index}>{token_pattern})' for index, (token_pattern, tag) in enumerate(token_exprs))
+    if as_bytes:
+        # \w only matches ASCII in bytes patterns, so count the bytes of non-ASCII characters as
+        # word characters too (ex. for the word boundaries of bound())
+        pattern = pattern.replace(r'\w', r'[\w\x80-\xff]').encode()
+    regex = re.compile(pattern)
+
+    tags = [None] * (regex.groups + 1)
+    for index, (token_pattern, tag) in enumerate(token_exprs):
+        tags[regex.groupindex[f'T{index}']] = tag
+
+    return regex, tags
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 # LEXER
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
-# Function for tokenizing a string of characters based on a set of token patterns.
-def lex(characters, token_exprs):
-    pos = 0             # Current position in the input string
-    tokens = []         # List to hold the tokenized output
-    line_number = 1     # Start with line number 1
+# Function for tokenizing a string of characters based on a compiled set of token patterns.
+# token_regex is the (regex, tags) pair returned by compile_token_exprs().
+# hooks is an optional dict of tag to function(characters, match, line_number) that is called for the
+# matches of that tag (ex. to validate them). The hook returns the tag to keep the token with (or None).
+# characters can also be a bytes-like buffer (ex. an mmap) if token_regex was compiled with as_bytes
+# and the encoding of the buffer is given; only the token values are decoded, when they are read.
+# Returns a TokenStream (tokens are stored as offsets into characters, so no text is copied here).
+def lex(characters, token_regex, hooks=None, encoding=None):
+    regex, tags = token_regex
+    match_at = regex.match  # Avoid the attribute lookup for every token
+    find = characters.find
+    newline = '\n' if encoding is None else b'\n'
+    group_hooks = [hooks.get(tag) for tag in tags] if hooks else None
+
+    pos = 0                             # Current position in the input string
+    length = len(characters)
+    tokens = TokenStream(characters, encoding)  # Storage for the tokenized output
+    append = tokens.append
+    line_number = 1                     # Start with line number 1
 
     # Traverse through the contents of the input
-    while pos < len(characters):
-        match = None # Flag to track whether a match is found for the current position
-
-        # traverse through the list of regex patterns for tokens
-        for token_expr in token_exprs:
-            pattern, tag = token_expr               # Extract regex pattern and tag from token_expr; ex. ('HAI', 'Reserved')
-            regex = re.compile(pattern)             # Compile the regex
-            match = regex.match(characters, pos)    # Try to match the pattern at the current position
-            
-            # If there's a match, get the matched text
-            if match:
-                text = match.group(0)
-
-                # But only add token to the list if it has a valid tag 
-                if tag:
-                    token = (text, tag, line_number)
-                    tokens.append(token)
-
-                # Update line count if a newline is encountered in the matched text
-                line_number += text.count('\n')
-
-                 # Exit the loop once a match is found
-                break
+    while pos < length:
+        # Try every token pattern at once at the current position
+        match = match_at(characters, pos)
 
         # If there's no match found, then there's an error
         if not match:
-            sys.stderr.write("Illegal character: '%s' at %d\n" % (characters[pos], line_number))
-            sys.exit(1)
-        
-        # If match found, move the position pointer to the end of the matched text
-        else:
-            pos = match.end(0)
-    
-    # Return the list of tokens
+            raise LexError("Illegal character: '%s' at %d" % (character_at(characters, pos, encoding), line_number), line_number)
+
+        # The outermost group that matched tells which pattern (and tag) won
+        end = match.end()
+        tag = tags[match.lastindex]
+
+        # Let the hook of the tag (if there's any) check the match
+        if group_hooks and group_hooks[match.lastindex]:
+            tag = group_hooks[match.lastindex](characters, match, line_number)
+
+        # But only add token to the list if it has a valid tag
+        if tag is not None:
+            append(tag, pos, end, line_number)
+
+        # Update line count if a newline is encountered in the matched text
+        # (find() instead of count(), since mmaps don't have count())
+        newline_pos = find(newline, pos, end)
+        while newline_pos != -1:
+            line_number += 1
+            newline_pos = find(newline, newline_pos + 1, end)
+
+        # Move the position pointer to the end of the matched text
+        pos = end
+
+    # Return the tokens
+    return tokens
+
+# Function to get the character at a certain position of a string or of an encoded buffer
+def character_at(characters, pos, encoding=None):
+    if encoding is None:
+        return characters[pos]
+
+    # A character takes at most 4 bytes (UTF-8)
+    return characters[pos:pos + 4].decode(encoding, errors='replace')[0]
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL LEXER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Function to lex a new version of a source, reusing the tokens of the previous version.
+# The edit replaced the characters from start to old_end of the old source (whose TokenStream is
+# old_tokens) with the characters from start to new_end of characters.
+# A match only depends on the text from where it starts (and on the character before it), so:
+# - lexing restarts at the last old token that ends more than lookahead characters before the edit
+#   (lookahead is how far past the end of a token the patterns can read, ex. a keyword of several
+#   words that didn't match)
+# - lexing stops at the first position after the edit where an old token started, since everything
+#   after it is the same text (so its tokens are the old ones, moved by the size of the edit).
+# Returns the new TokenStream, the index of its first new token, and the index of the first reused
+# token in the old and in the new tokens (the number of tokens if none were reused).
+def relex(characters, old_tokens, start, old_end, new_end, token_regex, hooks=None, lookahead=0):
+    regex, tags = token_regex
+    match_at = regex.match
+    find = characters.find
+    group_hooks = [hooks.get(tag) for tag in tags] if hooks else None
+
+    old_starts = old_tokens.starts
+    old_count = len(old_tokens)
+    shift = new_end - old_end
+
+    # Keep the tokens before the restart point
+    first = bisect_left(old_tokens.ends, start - lookahead) - 1
+    if first < 0:
+        first = 0
+        pos = 0
+        line_number = 1
+    else:
+        pos = old_starts[first]
+        line_number = old_tokens.lines[first]
+
+    tokens = TokenStream(characters)
+    tokens.extend(old_tokens.tags[:first], old_starts[:first], old_tokens.ends[:first], old_tokens.lines[:first])
+    append = tokens.append
+
+    length = len(characters)
+    old_index = first   # First old token that could start at or after the current position
+    while pos < length:
+        # Reuse the rest of the old tokens once an old token starts here (after the edit)
+        if pos > new_end:
+            old_pos = pos - shift
+            while old_index < old_count and old_starts[old_index] < old_pos:
+                old_index += 1
+            if old_index < old_count and old_starts[old_index] == old_pos:
+                new_index = len(tokens)
+                tokens.extend(
+                    old_tokens.tags[old_index:], old_starts[old_index:], old_tokens.ends[old_index:], old_tokens.lines[old_index:],
+                    shift, line_number - old_tokens.lines[old_index],
+                )
+                return tokens, first, old_index, new_index
+
+        # Same as lex()
+        match = match_at(characters, pos)
+        if not match:
+            raise LexError("Illegal character: '%s' at %d" % (characters[pos], line_number), line_number)
+
+        end = match.end()
+        tag = tags[match.lastindex]
+        if group_hooks and group_hooks[match.lastindex]:
+            tag = group_hooks[match.lastindex](characters, match, line_number)
+        if tag is not None:
+            append(tag, pos, end, line_number)
+
+        newline_pos = find('\n', pos, end)
+        while newline_pos != -1:
+            line_number += 1
+            newline_pos = find('\n', newline_pos + 1, end)
+
+        pos = end
+
+    return tokens, first, old_count, len(tokens)
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# PARALLEL LEXER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Function to split a string into (at most) count chunks that start at the beginning of a line
+def line_chunks(characters, count):
+    starts = [0]
+    for index in range(1, count):
+        start = characters.find('\n', len(characters) * index // count) + 1
+        if start <= starts[-1]: break
+        starts.append(start)
+    return list(zip(starts, starts[1:] + [len(characters)]))
+
+# Function to lex a chunk in a worker process.
+# Returns the columns of the TokenStream (the source is not sent back), or None on a lexer error.
+def lex_chunk_columns(lex_chunk, chunk):
+    try:
+        tokens = lex_chunk(chunk)
+    except LexError:
+        return None
+    return tokens.tags, tokens.starts, tokens.ends, tokens.lines
+
+# Parallel version of a lexer function for huge inputs.
+# lex_chunk is a module-level function (so it can be sent to the worker processes) that lexes a whole
+# string and returns a TokenStream (ex. lolcode_lex). The input is split at line starts, the chunks are
+# lexed in a process pool, and the tokens are stitched back with their global offsets and line numbers.
+# A chunk boundary is only safe outside of multi-line constructs. Patterns that can't match without
+# their closing delimiter (ex. strings) make the chunk fail to lex, and closers (a dict of opening to
+# closing delimiters, see lex_stream()) catch the constructs whose text could lex as something else
+# when cut (ex. 'OBTWHAI' without its 'TLDR' is an identifier). A chunk that fails or ends with an
+# unclosed opener is merged with the next one and lexed again. If the failure is a real error, the
+# whole input is lexed in one go so the error is raised with the right line number.
+def lex_parallel(characters, lex_chunk, workers, closers=None, min_chunk_size=1 << 20):
+    count = min(workers, len(characters) // min_chunk_size)
+    if count < 2:
+        return lex_chunk(characters)
+
+    chunks = line_chunks(characters, count)
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        results = list(executor.map(partial(lex_chunk_columns, lex_chunk), (characters[start:end] for start, end in chunks)))
+
+    closers = closers or {}
+    def is_unclosed(start, end):
+        for opener, closer in closers.items():
+            opener_pos = characters.rfind(opener, start, end)
+            if opener_pos != -1 and characters.find(closer, opener_pos + len(opener), end) == -1:
+                return True
+        return False
+
+    tokens = TokenStream(characters)
+    line_offset = 0         # Number of lines before the current chunk
+    index = 0
+    while index < len(chunks):
+        start, end = chunks[index]
+        columns = results[index]
+
+        # Merge the chunk with the next ones until it ends at a safe line boundary
+        while (columns is None or is_unclosed(start, end)) and index + 1 < len(chunks):
+            index += 1
+            end = chunks[index][1]
+            columns = lex_chunk_columns(lex_chunk, characters[start:end])
+        if columns is None:
+            return lex_chunk(characters)
+
+        tokens.extend(*columns, start, line_offset)
+        line_offset += characters.count('\n', start, end)
+        index += 1
+
     return tokens
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# STREAMING LEXER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Function for splitting a source into text chunks.
+# The source can be a string, a file object (read chunk_size characters at a time), or any
+# iterable of strings (ex. the lines of a file or a pipe).
+def read_chunks(source, chunk_size=65536):
+    if isinstance(source, str):
+        yield source
+        return
+
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk: return
+            yield chunk
+
+    yield from source
+
+# Generator version of lex() for sources that come in chunks.
+# Tokens are yielded as soon as they are known, and only the unconsumed text is kept in memory.
+# A token is only trusted once the line it ends on is complete (multi-word keywords like 'I HAS A'
+# can be cut by a chunk boundary). Constructs that span lines are handled by:
+# - patterns that can't match until they're closed (ex. a string waiting for its closing quote)
+# - closers, a dict of opening to closing delimiters; text starting with an opening delimiter
+#   is not lexed until its closing delimiter has been read (ex. {'OBTW': 'TLDR'})
+# The current line is always kept in the buffer, so hooks (see lex()) can look at the whole line.
+def lex_stream(chunks, token_regex, closers=None, hooks=None):
+    regex, tags = token_regex
+    match_at = regex.match
+    group_hooks = [hooks.get(tag) for tag in tags] if hooks else None
+    closers = closers or {}
+    opener_starts = {opener[0] for opener in closers}   # To skip the closers check for most tokens
+
+    chunks = iter(chunks)
+    buffer = ''         # Text that hasn't been tokenized yet (plus the character before it)
+    pos = 0             # Current position in the buffer
+    line_number = 1     # Start with line number 1
+    at_eof = False      # Flag to track if every chunk has been read
+
+    while not at_eof:
+        chunk = next(chunks, None)
+
+        if chunk is None:
+            at_eof = True
+        else:
+            # Drop the consumed text, but keep the current line and at least one character
+            # (for the (?<!\w) checks of bound())
+            cut = min(pos - 1, buffer.rfind('\n', 0, pos) + 1)
+            if cut > 0:
+                buffer = buffer[cut:]
+                pos -= cut
+            buffer += chunk
+
+        # Tokenize up to the last complete line (or up to the end if there's nothing left to read)
+        limit = len(buffer) if at_eof else buffer.rfind('\n')
+
+        while pos < len(buffer):
+            match = match_at(buffer, pos)
+
+            if not at_eof:
+                # Wait for more text if the token might continue in the next chunk
+                if match is None or match.end() > limit:
+                    break
+
+                # Wait for more text if a multi-line construct hasn't been closed yet
+                if buffer[pos] in opener_starts and any(buffer.startswith(opener, pos) and buffer.find(closer, pos + len(opener)) == -1
+                       for opener, closer in closers.items()):
+                    break
+
+            # If there's no match found, then there's an error
+            if not match:
+                raise LexError("Illegal character: '%s' at %d" % (buffer[pos], line_number), line_number)
+
+            text = match.group()
+            tag = tags[match.lastindex]
+
+            # Let the hook of the tag (if there's any) check the match
+            if group_hooks and group_hooks[match.lastindex]:
+                tag = group_hooks[match.lastindex](buffer, match, line_number)
+
+            # But only yield the token if it has a valid tag
+            if tag is not None:
+                yield (text, tag, line_number)
+
+            # Update line count if a newline is encountered in the matched text
+            line_number += text.count('\n')
+
+            # Move the position pointer to the end of the matched text
+            pos = match.end()
@@ -1,3 +1,5 @@
+import mmap
+import os
 from .generic_lexer import *
 from .multi_line_comment_validator import *
 
@@ -9,89 +11,103 @@ TOKEN_VALUE = 0
 TOKEN_TAG = 1
 TOKEN_LINE_NUMBER = 2
 
+# Tags
+# Every tag is a small integer (cheap to store and to compare), with a description for display.
+TAG_NAMES = {}
+
+def new_tag(description):
+    tag = len(TAG_NAMES) + 1
+    TAG_NAMES[tag] = description
+    return tag
+
 # Keywords
-HAI = 'Program Start Delimeter'
-KTHXBYE = 'Program End Delimeter'
-WAZZUP = 'Variable Declaration Start Delimeter'
-BUHBYE = 'Variable Declaration End Delimeter'
-I_HAS_A ='Variable Declaration'
-ITZ = 'Variable Initialization'
-R = 'Assignment Keyword'
+HAI = new_tag('Program Start Delimeter')
+KTHXBYE = new_tag('Program End Delimeter')
+WAZZUP = new_tag('Variable Declaration Start Delimeter')
+BUHBYE = new_tag('Variable Declaration End Delimeter')
+I_HAS_A = new_tag('Variable Declaration')
+ITZ = new_tag('Variable Initialization')
+R = new_tag('Assignment Keyword')
 
 # Arithmetic Operations
-SUM_OF = 'Addition Operator'
-DIFF_OF = 'Subtraction Operator'
-PRODUKT_OF = 'Multiplication Operator'
-QUOSHUNT_OF = 'Division Operator'
-MOD_OF = 'Modulus Operator'
-BIGGR_OF = 'Greater Than Operator'
-SMALLR_OF = 'Less Than Operator'
-BOTH_OF = 'AND Operator'
-EITHER_OF = 'OR Operator'
-WON_OF = 'XOR Operator'
-NOT = 'NOT Operator'
-ANY_OF = 'ANY Operator'
-ALL_OF = 'ALL Operator'
-BOTH_SAEM = 'Equality Operator'
-DIFFRINT = 'Inequality Operator'
-SMOOSH = 'String Concatenate Operator'
-MAEK_A = 'Typecast Operator'
-IS_NOW_A = 'Typecast IS NOW A Operator'
+SUM_OF = new_tag('Addition Operator')
+DIFF_OF = new_tag('Subtraction Operator')
+PRODUKT_OF = new_tag('Multiplication Operator')
+QUOSHUNT_OF = new_tag('Division Operator')
+MOD_OF = new_tag('Modulus Operator')
+BIGGR_OF = new_tag('Greater Than Operator')
+SMALLR_OF = new_tag('Less Than Operator')
+BOTH_OF = new_tag('AND Operator')
+EITHER_OF = new_tag('OR Operator')
+WON_OF = new_tag('XOR Operator')
+NOT = new_tag('NOT Operator')
+ANY_OF = new_tag('ANY Operator')
+ALL_OF = new_tag('ALL Operator')
+BOTH_SAEM = new_tag('Equality Operator')
+DIFFRINT = new_tag('Inequality Operator')
+SMOOSH = new_tag('String Concatenate Operator')
+MAEK_A = new_tag('Typecast Operator')
+IS_NOW_A = new_tag('Typecast IS NOW A Operator')
 
 # Part of the expression for operands
-AN = 'Operand Connector'
-YR = 'Parameter Variable'
-AN_YR = 'Additional Parameter Variable'
+AN = new_tag('Operand Connector')
+YR = new_tag('Parameter Variable')
+AN_YR = new_tag('Additional Parameter Variable')
 
 # Statements
-VISIBLE = 'Print Statement'
-VISIBLE_OPERATOR = 'Print Statement Delimiter'
-GIMMEH = 'Input Statement'
-O_RLY = 'Conditional Start Delimeter'
-YA_RLY = 'If Clause'
-MEBBE = 'Else-If Clause'
-NO_WAI = 'Else Clause'
-OIC = 'Conditional End Delimeter'
-WTF = 'Switch-Case Start Delimeter'
-OMG = 'Case Clause'
-OMGWTF = 'Switch-Case End Delimeter'
-IM_IN_YR = 'Loop Start Delimeter'
-UPPIN = 'Increment Operator'
-NERFIN = 'Decrement Operator'
-TIL = 'Until Loop'
-WILE = 'While Loop'
-IM_OUTTA_YR = 'Loop End Delimeter'
+VISIBLE = new_tag('Print Statement')
+VISIBLE_OPERATOR = new_tag('Print Statement Delimiter')
+GIMMEH = new_tag('Input Statement')
+O_RLY = new_tag('Conditional Start Delimeter')
+YA_RLY = new_tag('If Clause')
+MEBBE = new_tag('Else-If Clause')
+NO_WAI = new_tag('Else Clause')
+OIC = new_tag('Conditional End Delimeter')
+WTF = new_tag('Switch-Case Start Delimeter')
+OMG = new_tag('Case Clause')
+OMGWTF = new_tag('Switch-Case End Delimeter')
+IM_IN_YR = new_tag('Loop Start Delimeter')
+UPPIN = new_tag('Increment Operator')
+NERFIN = new_tag('Decrement Operator')
+TIL = new_tag('Until Loop')
+WILE = new_tag('While Loop')
+IM_OUTTA_YR = new_tag('Loop End Delimeter')
 # Functions
-HOW_IZ_I = 'Function Start Delimeter'
-IF_U_SAY_SO = 'Function End Delimeter'
-GTFO = 'Function Return'
-FOUND_YR = 'Function Return Value'
-I_IZ = 'Function Call'
-MKAY = 'Statement End Delimeter'
+HOW_IZ_I = new_tag('Function Start Delimeter')
+IF_U_SAY_SO = new_tag('Function End Delimeter')
+GTFO = new_tag('Function Return')
+FOUND_YR = new_tag('Function Return Value')
+I_IZ = new_tag('Function Call')
+MKAY = new_tag('Statement End Delimeter')
 
 # Literals
-NUMBR = 'Integer'
-NUMBAR = 'Float'
-TROOF = 'Boolean'
-YARN = 'String'
-LITERAL_TYPE = 'Literal Type'
+NUMBR = new_tag('Integer')
+NUMBAR = new_tag('Float')
+TROOF = new_tag('Boolean')
+YARN = new_tag('String')
+LITERAL_TYPE = new_tag('Literal Type')
 
-NOOB = "NULL"
+NOOB = new_tag("NULL")
 
 # Identifier
-IDENTIFIER = 'Identifier'
+IDENTIFIER = new_tag('Identifier')
+
+# Multi-line comments (validated by the lexer, but not kept as tokens)
+MULTI_LINE_COMMENT = new_tag('Multi-line Comment')
+MULTI_LINE_COMMENT_KEYWORD = new_tag('Multi-line Comment Keyword')
 
 # End of File
-EOF = 'End of File'
+EOF = new_tag('End of File')
 
 # Make sure that the pattern matches as a whole word, excluding it from being part of larger words.
 def bound(pattern):
     return rf'(?<!\w){pattern}(?!\w)'
 
 token_exprs = [
-    (r'[ \n\t]+',                             None),   # whitespace (ignore)
-    (r'BTW[^\n]*',                            None),   # single line comments (ignore)
-    (r'OBTW\s*((.|\n)*?)\s*TLDR',             None),   # multi-line comments (ignore)
+    (r'[ \r\n\t]+',                           None),   # whitespace (ignore, '\r' for CRLF files that are lexed as-is)
+    (r'BTW[^\r\n]*',                          None),   # single line comments (ignore)
+    (r'OBTW\s*((.|\n)*?)\s*TLDR',             MULTI_LINE_COMMENT),           # multi-line comments (ignore)
+    (bound('(OBTW|TLDR)'),                    MULTI_LINE_COMMENT_KEYWORD),   # unpaired OBTW or TLDR (error)
     (bound('HAI'),                            HAI),
     (bound('KTHXBYE'),                        KTHXBYE),
     (bound('WAZZUP'),                         WAZZUP),
@@ -152,6 +168,60 @@ token_exprs = [
     (bound('[a-zA-Z][a-zA-Z0-9_]*'),          IDENTIFIER),      # Identifier
 ]
 
-def lolcode_lex(characters):
-    validate_multiline_comments(characters) # Validate the existence of multi-line comments
-    return lex(characters, token_exprs)
+# Combine all the token patterns into one regex (done only once, when the module is imported)
+token_regex = compile_token_exprs(token_exprs)
+bytes_token_regex = compile_token_exprs(token_exprs, as_bytes=True)    # For memory-mapped files
+
+# Function to get the lexer hooks that validate multi-line comments during the scan
+def multi_line_comment_hooks(validator):
+    return {
+        MULTI_LINE_COMMENT: validator.check_comment,
+        MULTI_LINE_COMMENT_KEYWORD: validator.check_keyword,
+    }
+
+# Multi-line constructs that have to be fully read before they can be tokenized
+# (strings need no entry since their pattern can't match until the closing quote is read)
+multi_line_closers = {'OBTW': 'TLDR'}
+
+# If workers is more than 1, huge inputs are lexed in parallel (see lex_parallel()).
+def lolcode_lex(characters, workers=None):
+    if workers and workers > 1:
+        return lex_parallel(characters, lolcode_lex, workers, multi_line_closers)
+
+    validator = MultiLineCommentValidator() # Validate the multi-line comments while scanning
+    tokens = lex(characters, token_regex, multi_line_comment_hooks(validator))
+    validator.finish()
+    return tokens
+
+# How far past the end of a token the patterns can read (the longest keyword, 'IF U SAY SO', and
+# the character after it that bound() checks)
+token_lookahead = 12
+
+# Incremental version of lolcode_lex() for a source that was edited (see relex()).
+def lolcode_relex(characters, old_tokens, start, old_end, new_end):
+    validator = MultiLineCommentValidator()
+    result = relex(characters, old_tokens, start, old_end, new_end, token_regex, multi_line_comment_hooks(validator), token_lookahead)
+    validator.finish()
+    return result
+
+# Version of lolcode_lex() for source files.
+# The file is memory-mapped and scanned in place, so it is never read into a string; only the token
+# values are decoded (when they are read from the returned TokenStream, which keeps the mapping open).
+def lolcode_lex_file(path, encoding='utf-8'):
+    with open(path, 'rb') as file:
+        # Empty files can't be mapped
+        if not os.fstat(file.fileno()).st_size:
+            return lolcode_lex('')
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    validator = MultiLineCommentValidator()
+    tokens = lex(buffer, bytes_token_regex, multi_line_comment_hooks(validator), encoding)
+    validator.finish()
+    return tokens
+
+# Streaming version of lolcode_lex() for large or piped sources.
+# Reads from a file object or an iterable of text chunks and yields tokens one at a time.
+def lolcode_lex_stream(source, chunk_size=65536):
+    validator = MultiLineCommentValidator()
+    yield from lex_stream(read_chunks(source, chunk_size), token_regex, multi_line_closers, multi_line_comment_hooks(validator))
+    validator.finish()
@@ -1,79 +1,94 @@
-import sys
 import re
+from .errors import *
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 # MULT-LINE VALIDATOR
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
-# Function to check if a certain word in a line is inside a string or not
-def is_word_in_quotes(line, word):
-    return bool(re.search(rf'"[^"]*\b{re.escape(word)}\b[^"]*"', line))
+OBTW_WORD = re.compile(r'\bOBTW\b')
+TLDR_WORD = re.compile(r'\bTLDR\b')
 
-# Function to validate multiline comments in the input text.
+# Function to get the start and end positions of the line that contains a certain position
+# (characters can also be a bytes-like buffer, see lex())
+def line_bounds(characters, pos):
+    newline = '\n' if isinstance(characters, str) else b'\n'
+    line_start = characters.rfind(newline, 0, pos) + 1
+    line_end = characters.find(newline, pos)
+    if line_end == -1: line_end = len(characters)
+    return line_start, line_end
+
+# Function to get a part of the input as a string (the checks are rare, so decoding here is cheap)
+def text_between(characters, start, end):
+    text = characters[start:end]
+    return text if isinstance(text, str) else text.decode('utf-8', errors='replace')
+
+# Class to validate multiline comments while the lexer scans the input (used as lexer hooks).
 # Ensures that:
 # - 'OBTW' starts a block and is properly closed by 'TLDR' on a separate line.
 # - 'TLDR' does not appear without a preceding 'OBTW'.
 # - 'OBTW' and 'TLDR' do not coexist on the same line unless both are inside a string.
 # - 'OBTW' is only preceded by whitespace/s, and 'TLDR' is only followed by whitespace/s.
-def validate_multiline_comments(characters) :
-    # print(characters) # For debugging
-
-    inside_obtw = False                 # Flag to track if we're inside an OBTW block
-    found_tldr_without_obtw = False     # Flag to track standalone TLDR
-
-    # Traverse through the contents of the input
-    for line_number, line in  enumerate(characters.splitlines(), 1):
-        # Check if both OBTW and TLDR are on the same line
-        # Raise an error if they are
-        if re.search(r'\bOBTW\b', line) and re.search(r'\bTLDR\b', line):
-            if not (is_word_in_quotes(line, 'OBTW') and is_word_in_quotes(line, 'TLDR')):
-                sys.stderr.write(f"Error: 'OBTW' and 'TLDR' cannot coexist on the same line (line {line_number}).\n")
-                sys.exit(1)
-
-        # Validate the existence of the 'OBTW' keyword
-        if re.search(r'\bOBTW\b', line):
-            # Skip if 'OBTW' is inside a string
-            if is_word_in_quotes(line, 'OBTW'):
-                continue            
-
-            # Skip if inside an OBTW block
-            if inside_obtw:         
-                continue
-
-            # Skip if 'OBTW' is preceded by whitespace/s only
-            if line.lstrip().startswith("OBTW"):
-                inside_obtw = True  # Set flag to indicate we're inside an OBTW block
-                continue            
+# Strings are tokens of their own, so keywords inside them never reach these checks.
+class MultiLineCommentValidator:
+    def __init__(self):
+        self.found_tldr_without_obtw = False    # Flag to track standalone TLDR
+        self.tldr_without_obtw_line_number = None
+
+    # Hook for a whole 'OBTW ... TLDR' block
+    def check_comment(self, characters, match, line_number):
+        start, end = match.span()
+        tldr_line_number = line_number + text_between(characters, start, end).count('\n')
+        line_start = line_bounds(characters, start)[0]
+        tldr_line_start, tldr_line_end = line_bounds(characters, end)
+
+        # Raise an error if both OBTW and TLDR are on the same line
+        if tldr_line_number == line_number:
+            raise LexError(f"Error: 'OBTW' and 'TLDR' cannot coexist on the same line (line {line_number}).", line_number)
+
+        # Raise an error if 'OBTW' is preceded by anything other than whitespace/s
+        if text_between(characters, line_start, start).strip():
+            raise LexError(f"Error: 'OBTW' multiline comment keyword at line {line_number} can only be preceded by whitespace/s.", line_number)
+
+        # Raise an error if the closing line of the block also has an 'OBTW' on it
+        if OBTW_WORD.search(text_between(characters, tldr_line_start, tldr_line_end)):
+            raise LexError(f"Error: 'OBTW' and 'TLDR' cannot coexist on the same line (line {tldr_line_number}).", tldr_line_number)
+
+        # Raise an error if 'TLDR' is followed by anything other than whitespace/s
+        if text_between(characters, end, tldr_line_end).strip():
+            raise LexError(f"Error: 'TLDR' multiline comment keyword at line {tldr_line_number} can only be followed by whitespace/s.", tldr_line_number)
 
+        # Comments are not kept as tokens
+        return None
+
+    # Hook for an 'OBTW' or 'TLDR' that isn't part of a block
+    def check_keyword(self, characters, match, line_number):
+        start, end = match.span()
+        line_start, line_end = line_bounds(characters, start)
+
+        # Raise an error if both OBTW and TLDR are on the same line
+        line = text_between(characters, line_start, line_end)
+        if OBTW_WORD.search(line) and TLDR_WORD.search(line):
+            raise LexError(f"Error: 'OBTW' and 'TLDR' cannot coexist on the same line (line {line_number}).", line_number)
+
+        if text_between(characters, start, end) == 'OBTW':
             # Raise an error if 'OBTW' is preceded by anything other than whitespace/s
-            sys.stderr.write(f"Error: 'OBTW' multiline comment keyword at line {line_number} can only be preceded by whitespace/s.\n")
-            sys.exit(1)
-
-        # Validate the existence of the 'TLDR' keyword
-        if re.search(r'\bTLDR\b', line):
-            # Skip if 'TLDR' is inside a string
-            if is_word_in_quotes(line, 'TLDR') and not inside_obtw:
-                continue
-            
-            # Skip if 'TLDR' is followed by whitespace/s only
-            # But first check if it has a valid 'OBTW' pair
-            if line.rstrip().endswith("TLDR"):
-                if not inside_obtw:  # TLDR found without a preceding OBTW
-                    found_tldr_without_obtw = True
-
-                inside_obtw = False  # Reset the flag when exiting the block
-                continue
-
-            # Raise an error if 'OBTW' is followed by anything other than whitespace/s
-            sys.stderr.write(f"Error: 'TLDR' multiline comment keyword at line {line_number} can only be followed by whitespace/s.\n")
-            sys.exit(1)
-    
-    # Ensure that there's a closing TLDR if we left the block open
-    if inside_obtw:
-        sys.stderr.write(f"Error: Missing 'TLDR' to close the 'OBTW' block.\n")
-        sys.exit(1)
-
-    # Ensure that TLDR does not appear without a preceding OBTW
-    if found_tldr_without_obtw:
-        sys.stderr.write("Error: Found 'TLDR' without a preceding 'OBTW'.\n")
-        sys.exit(1)
-        
\ No newline at end of file
+            if text_between(characters, line_start, start).strip():
+                raise LexError(f"Error: 'OBTW' multiline comment keyword at line {line_number} can only be preceded by whitespace/s.", line_number)
+
+            # Otherwise, the block was never closed
+            raise LexError("Error: Missing 'TLDR' to close the 'OBTW' block.", line_number)
+
+        # Raise an error if 'TLDR' is followed by anything other than whitespace/s
+        if text_between(characters, end, line_end).strip():
+            raise LexError(f"Error: 'TLDR' multiline comment keyword at line {line_number} can only be followed by whitespace/s.", line_number)
+
+        # TLDR found without a preceding OBTW (reported once the whole input has been scanned)
+        if not self.found_tldr_without_obtw:
+            self.found_tldr_without_obtw = True
+            self.tldr_without_obtw_line_number = line_number
+        return None
+
+    # Checks that can only be done once the whole input has been scanned
+    def finish(self):
+        # Ensure that TLDR does not appear without a preceding OBTW
+        if self.found_tldr_without_obtw:
+            raise LexError("Error: Found 'TLDR' without a preceding 'OBTW'.", self.tldr_without_obtw_line_number)
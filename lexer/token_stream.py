@@ -0,0 +1,66 @@
+from array import array
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# TOKEN STREAM
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Compact storage for the tokens of a source.
+# Instead of one (value, tag, line number) tuple per token, the tokens are kept in parallel arrays
+# of integer tags, start/end offsets and line numbers. The token values are sliced from the source
+# only when a token is read.
+# The source can also be a bytes-like buffer (ex. an mmap) with its encoding, in which case the
+# offsets are byte offsets and the token values are decoded when they are read.
+class TokenStream:
+    def __init__(self, source, encoding=None):
+        self.source = source
+        self.encoding = encoding
+        self.tags = array('B')      # Integer tag of each token
+        self.starts = array('Q')    # Offset of the first character of each token in the source
+        self.ends = array('Q')      # Offset right after the last character of each token
+        self.lines = array('I')     # Line number of each token
+
+    def append(self, tag, start, end, line_number):
+        self.tags.append(tag)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line_number)
+
+    # Append the columns of another TokenStream, whose offsets and line numbers are relative to
+    # offset and line_offset (ex. the tokens of a chunk of the source)
+    def extend(self, tags, starts, ends, lines, offset=0, line_offset=0):
+        self.tags.extend(tags)
+        self.starts.extend(map(offset.__add__, starts))
+        self.ends.extend(map(offset.__add__, ends))
+        self.lines.extend(map(line_offset.__add__, lines))
+
+    def value(self, index):
+        value = self.source[self.starts[index]:self.ends[index]]
+        return value if self.encoding is None else value.decode(self.encoding)
+
+    def __len__(self):
+        return len(self.tags)
+
+    # Tuple view of a token: (value, tag, line number), same as the tokens of lex_stream()
+    def __getitem__(self, index):
+        return (self.value(index), self.tags[index], self.lines[index])
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    # Iterate over the tokens from a certain index on (ex. to parse the end of the tokens again)
+    def iter_from(self, index):
+        source = self.source
+        encoding = self.encoding
+        columns = zip(*(column[index:] if index else column for column in (self.tags, self.starts, self.ends, self.lines)))
+        if encoding is None:
+            for tag, start, end, line_number in columns:
+                yield (source[start:end], tag, line_number)
+        else:
+            for tag, start, end, line_number in columns:
+                yield (source[start:end].decode(encoding), tag, line_number)
+
+    # Tokens as (value, tag description, line number) tuples (the rows of the GUI's lexeme table)
+    def as_tuples(self, tag_names):
+        return [(value, tag_names[tag], line_number) for value, tag, line_number in self]
+
+    def __repr__(self):
+        return f"TokenStream({len(self)} tokens)"
@@ -1,6 +1,8 @@
 import sys
 from lexer.lolcode_lexer import *
 from parser.lolcode_parser import *
+from parser.parse_cache import ParseCache
+from optimizer.lolcode_optimizer import Optimizer
 from interpreter.lolcode_interpreter import *
 from interpreter.values import *
 from common import globals
@@ -9,37 +11,119 @@ from common import globals
 globals.symbol_table = SymbolTable()
 globals.symbol_table.set("IT", Number(0))
 
+# Initialize the cache of the tokens and ASTs of the programs that were already parsed
+globals.parse_cache = ParseCache()
+
+# Initialize the passes that rewrite the AST before it runs
+globals.optimizer = Optimizer()
+
 # ═══════════════════════════════════════════════════════════════════════════════════════════════
 # Function to run the LOLCODE interpreter
-def run_lolcode(inputText=None):
+# With front_end (an IncrementalFrontEnd, ex. the GUI's editor), only the part of the source that
+# changed since its last update is lexed and parsed again.
+def run_lolcode(inputText=None, front_end=None):
     if inputText is None:
         return None, None
 
     # print('Input Text:')
     # print(inputText)
 
+    if front_end is not None:
+        program, error = front_end.update(inputText)
+        globals.tokens = front_end.tokens
+        if error: return None, error
+        return run_lolcode_ast(program)
+
+    # Reuse the tokens and AST of the same source if it was already parsed (see ParseCache)
+    cached = globals.parse_cache.load(inputText) if globals.parse_cache is not None else None
+    if cached is not None:
+        globals.tokens, program = cached
+        return run_lolcode_ast(program)
+
     # Generate Tokens
-    globals.tokens = lolcode_lex(inputText)
+    try:
+        globals.tokens = lolcode_lex(inputText)
+    except LexError as error:
+        globals.tokens = None
+        return None, error
     # tokens.append(('EOF', EOF, tokens[-1][TOKEN_LINE_NUMBER])) # Add end of line
 
     # print('\nTokens:')
     # print(globals.tokens)
     # print()
 
+    program, error = parse_lolcode_tokens(globals.tokens)
+    if error: return None, error
+
+    if globals.parse_cache is not None:
+        globals.parse_cache.store(inputText, globals.tokens, program)
+
+    return run_lolcode_ast(program)
+
+# ───────────────────────────────────────────────────────────────────────────────────────────────
+# Function to run the LOLCODE interpreter on a source file
+# The file is memory-mapped and lexed in place instead of being read into a string first.
+def run_lolcode_file(path=None):
+    if path is None:
+        return None, None
+
+    try:
+        globals.tokens = lolcode_lex_file(path)
+    except LexError as error:
+        globals.tokens = None
+        return None, error
+
+    return run_lolcode_tokens(globals.tokens)
+
+# ───────────────────────────────────────────────────────────────────────────────────────────────
+# Function to run the LOLCODE interpreter on a large or piped source (a file object or an iterable of text chunks)
+# The tokens are lexed lazily as the parser consumes them, so they're not kept in globals.tokens.
+def run_lolcode_stream(source=None):
+    if source is None:
+        return None, None
+
+    globals.tokens = None
+    return run_lolcode_tokens(lolcode_lex_stream(source))
+
+# ───────────────────────────────────────────────────────────────────────────────────────────────
+# Function to parse and run LOLCODE tokens (a list or any iterable of tokens)
+def run_lolcode_tokens(tokens):
+    program, error = parse_lolcode_tokens(tokens)
+    if error: return None, error
+
+    return run_lolcode_ast(program)
+
+# ───────────────────────────────────────────────────────────────────────────────────────────────
+# Function to parse LOLCODE tokens
+# Returns the program node and the error that stopped the lexer or the parser (one of them is None).
+def parse_lolcode_tokens(tokens):
     # Generate ast
-    lolcode_parser = Parser(globals.tokens)
-    ast = lolcode_parser.parse()
+    # (streamed tokens are lexed during parsing, so lexer errors can also come up here)
+    try:
+        lolcode_parser = Parser(tokens)
+        ast = lolcode_parser.parse()
+    except LexError as error:
+        return None, error
     if ast.error: return None, ast.error
 
     # print('\nAST:')
     # print(ast.node)
     # print()
 
+    return ast.node, None
+
+# ───────────────────────────────────────────────────────────────────────────────────────────────
+# Function to run a parsed LOLCODE program
+def run_lolcode_ast(program):
+    # Optimize the program (the cached and incrementally parsed ASTs are kept as they were parsed)
+    if globals.optimizer is not None:
+        program = globals.optimizer.optimize(program)
+
     # Run program
     lolcode_interpreter = Interpreter()
     context = Context('<program>')
     context.symbol_table = globals.symbol_table
-    result = lolcode_interpreter.visit(ast.node, context)
+    result = lolcode_interpreter.visit(program, context)
 
     # print("\n─────────────────────────────────────────────────")
     # print("Symbol Table:")
@@ -50,8 +134,8 @@ def run_lolcode(inputText=None):
 
 # ───────────────────────────────────────────────────────────────────────────────────────────────
 # Helper function to handle the running of the LOLCODE interpreter
-def handle_run_lolcode(inputText=None):
-    result, error = run_lolcode(inputText)
+def handle_run_lolcode(inputText=None, front_end=None):
+    result, error = run_lolcode(inputText, front_end)
 
     # If program encounters an error
     if error: print(error.as_string())
@@ -99,11 +183,11 @@ _tests = {
 
 # Function to test the LOLCODE interpreter with a specific file (terminal-based interpreter)
 def test_run_lolcode():
-    file = open(_tests['b2']) 
-    characters = file.read()
-    file.close()
     globals.no_gui = True  # Terminal-based interpreter
-    handle_run_lolcode(characters)
+    result, error = run_lolcode_file(_tests['b2'])
+
+    # If program encounters an error
+    if error: print(error.as_string())
 
 # ═══════════════════════════════════════════════════════════════════════════════════════════════
 # For testing the implementation of the program
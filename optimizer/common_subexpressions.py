@@ -0,0 +1,243 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# COMMON SUBEXPRESSIONS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that reuses the value of an expression that a statement list computes again (ex. the same
+# SUM OF x AN y twice in a VISIBLE, or in the next statements) while the variables it reads keep
+# their values (see CommonNode). The statements are followed in the order they run:
+# - the first expression (the defining one) must run every time the statement list does, so it
+#   can't be in an operand that short-circuits (the next ones can be)
+# - an expression isn't reused after an assignment (R, IS NOW A, I HAS A or GIMMEH) of a variable it
+#   reads, and IT is assigned after every statement of the program's statement list
+# - no expression is reused after a statement that calls or defines a function or loops (a loop
+#   changes the value of its variable in place, and so does a function that loops on a parameter)
+# - MAEK A can give back its operand's Value, so it's only reused where its value is only read
+# The statement lists of IF, WTF?, loops and functions are their own statement lists.
+
+
+# Nodes that end the reuse of every expression (see the comment above)
+BARRIER_NODE_TYPES = (FuncCallNode, FuncDefNode, LoopNode, CountedLoopNode, InvariantLoopNode)
+LITERAL_NODE_TYPES = (IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode)
+# Statements whose expressions aren't reused (the statement lists in them are their own)
+COMPOUND_NODE_TYPES = (IfNode, SwitchCaseNode, SwitchTableNode, InputNode, BreakNode, VarDecListNode)
+
+class CommonSubexpressions(NodeTransformer):
+  def visit_root(self, root):
+    if type(root) is list:    # Body of a function parsed when it's called
+      return self.reuse(root)
+    return self.visit(root)
+
+  # Function to reuse the common subexpressions of a list of statements (top_level for the
+  # program's, after which IT is assigned), after the ones of the statement lists in them
+  def reuse(self, statements, top_level=False):
+    statements = self.visit(statements)
+    reused_groups = ExpressionScan().scan_statements(statements, top_level).reused_groups
+    if not reused_groups:
+      return statements
+    return ExpressionScan(reused_groups).scan_statements(statements, top_level).statements
+
+  # Function to reuse the common subexpressions of the lists of statements in some fields of a node
+  def reuse_fields(self, node, names):
+    fields = [getattr(node, name) for name in type(node).__slots__]
+    new_fields = [
+      self.reuse(field) if name in names and field is not None else self.visit(field)
+      for name, field in zip(type(node).__slots__, fields)
+    ]
+    if any(map(is_not, new_fields, fields)):
+      return copy_node(node, new_fields)
+    return node
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_StatementListNode(self, node):
+    statements = self.reuse(node.statements, True)
+    return node if statements is node.statements else StatementListNode(statements)
+
+  def visit_VarDecListNode(self, node):
+    return self.reuse_fields(node, ('variable_declarations',))
+
+  def visit_IfNode(self, node):
+    return self.reuse_fields(node, ('if_block_statements', 'else_block_statements'))
+
+  def visit_SwitchCaseNode(self, node):
+    cases_statements = [self.reuse(statements) for statements in node.cases_statements]
+    default_case_statements = self.reuse(node.default_case_statements)
+    if any(map(is_not, cases_statements, node.cases_statements)) or default_case_statements is not node.default_case_statements:
+      return SwitchCaseNode(node.cases, cases_statements, default_case_statements)
+    return node
+
+  def visit_LoopNode(self, node):
+    return self.reuse_fields(node, ('body_statements',))
+
+  def visit_FuncDefNode(self, node):
+    return self.reuse_fields(node, ('body_statements',))
+
+  def visit_CountedLoopNode(self, node):
+    return node
+
+  def visit_InvariantNode(self, node):
+    return node
+
+# Scan of a list of statements in the order they run, which finds the expressions whose value is
+# already known (the ones with the key of an available expression, see expression_key()).
+# It's done twice: the first scan finds the groups (a defining expression and the ones that reuse its
+# value) that are reused, and the second one replaces the expressions of those groups by CommonNodes.
+class ExpressionScan:
+  def __init__(self, reused_groups=None):
+    self.rewriting = reused_groups is not None
+    self.reused_groups = reused_groups if self.rewriting else set()
+    self.available = {}     # (group, names of the variables it reads) of the key of each available expression
+    self.group_count = 0
+    self.values = []        # Values of the CommonNodes (see CommonNode)
+    self.indices = {}       # Index in values of each reused group
+    self.statements = None
+
+  def scan_statements(self, statements, top_level):
+    new_statements = []
+    for statement in statements:
+      new_statements.append(self.scan_statement(statement))
+      if top_level:
+        self.invalidate('IT')
+    self.statements = new_statements if any(map(is_not, new_statements, statements)) else statements
+    return self
+
+  def scan_statement(self, statement):
+    assigned_names = set()
+    for node in walk(statement):
+      node_type = type(node)
+      if node_type in BARRIER_NODE_TYPES:
+        self.available.clear()
+        return statement
+      if node_type is VarAssignmentNode:
+        assigned_names.add(node.var_to_access[TOKEN_VALUE])
+      elif node_type is VarDeclarationNode:
+        assigned_names.add(node.var_name_token[TOKEN_VALUE])
+      elif node_type is InputNode:
+        assigned_names.add(node.variable.var_name_token[TOKEN_VALUE])
+
+    statement_type = type(statement)
+    if statement_type is PrintNode:
+      operands = [self.scan(operand, True) for operand in statement.operands]
+      if any(map(is_not, operands, statement.operands)):
+        statement = PrintNode(operands)
+    elif statement_type is VarAssignmentNode:
+      value = self.scan(statement.value_to_assign, False)
+      if value is not statement.value_to_assign:
+        statement = VarAssignmentNode(statement.var_to_access, value)
+    elif statement_type is VarDeclarationNode:
+      value = self.scan(statement.value_node, False)
+      if value is not statement.value_node:
+        statement = VarDeclarationNode(statement.var_name_token, value)
+    elif statement_type not in COMPOUND_NODE_TYPES:
+      statement = self.scan(statement, False)   # Expression (its value is assigned to IT)
+
+    # The variables are assigned after the expressions are evaluated
+    for name in assigned_names:
+      self.invalidate(name)
+    return statement
+
+  # Function to scan an expression (shared if its value is only read, and conditional if it isn't
+  # always evaluated when its statement runs)
+  def scan(self, node, shared, conditional=False):
+    node_type = type(node)
+    if node_type in OPERAND_FIELDS or (node_type is TypecastNode and shared):
+      key = expression_key(node)
+      if key is None:
+        return self.scan_operands(node, conditional)
+
+      group = self.available.get(key, (None,))[0]
+      if group is not None:
+        if not self.rewriting:
+          self.reused_groups.add(group)
+          return node
+        return CommonNode(node, self.values, self.indices[group], False, shared)
+
+      # The value of an expression that may not be evaluated can't be reused
+      if conditional:
+        return self.scan_operands(node, conditional)
+
+      group = self.group_count
+      self.group_count += 1
+      new_node = self.scan_operands(node, conditional)
+      names = {child.var_name_token[TOKEN_VALUE] for child in walk(node) if type(child) is VarAccessNode}
+      self.available[key] = (group, names)
+      if group not in self.reused_groups or not self.rewriting:
+        return new_node
+
+      self.indices[group] = len(self.values)
+      self.values.append(None)
+      return CommonNode(new_node, self.values, self.indices[group], True, shared)
+
+    if node_type is TypecastNode:
+      return self.scan_operands(node, conditional)
+    return node
+
+  def scan_operands(self, node, conditional):
+    node_type = type(node)
+    if node_type is TypecastNode:
+      # MAEK A can give back its operand's Value, so its operand is never shared
+      source_value = self.scan(node.source_value, False, conditional)
+      return node if source_value is node.source_value else TypecastNode(source_value, node.desired_type)
+
+    # The operands after the first one of a short-circuit operation may not be evaluated
+    short_circuit = node_type in (ShortCircuitBinaryOpNode, ShortCircuitTernaryOpNode)
+    fields = []
+    for name in node_type.__slots__:
+      field = getattr(node, name)
+      if name in OPERAND_FIELDS[node_type]:
+        if type(field) is list:
+          items = [
+            self.scan(item, True, conditional or (short_circuit and index > 0)) for index, item in enumerate(field)
+          ]
+          if any(map(is_not, items, field)):
+            field = items
+        else:
+          field = self.scan(field, True, conditional or (short_circuit and name == 'right_node'))
+      fields.append(field)
+
+    if any(field is not getattr(node, name) for name, field in zip(node_type.__slots__, fields)):
+      return copy_node(node, fields)
+    return node
+
+  # Function to end the reuse of the expressions that read a variable that is assigned
+  def invalidate(self, name):
+    for key in [key for key, (group, names) in self.available.items() if name in names]:
+      del self.available[key]
+
+# Function to get a key that is the same for the expressions that always have the same value when
+# the variables they read have the same values, or None if the expression can't be reused.
+# A literal's Value has its line number (ex. for the errors of MAEK A), which is only in the key of
+# the operand of MAEK A (line_numbers), since an operation always makes a new Value.
+def expression_key(node, line_numbers=False):
+  node_type = type(node)
+  if node_type is VarAccessNode:
+    return (VarAccessNode, node.var_name_token[TOKEN_VALUE])
+
+  if node_type in LITERAL_NODE_TYPES:
+    return (node_type, repr(getattr(node, 'value', None)), node.line_number if line_numbers else None)
+
+  if node_type is ConstantNode:
+    value = node.value
+    line_number = getattr(value, 'line_number', None) if line_numbers else None
+    return (ConstantNode, type(value), repr(getattr(value, 'value', value)), line_number)
+
+  if node_type is TypecastNode:
+    source_key = expression_key(node.source_value, True)
+    return None if source_key is None else (TypecastNode, node.desired_type, source_key)
+
+  if node_type in OPERAND_FIELDS:
+    key = [node_type]
+    for name in node_type.__slots__:
+      field = getattr(node, name)
+      if name not in OPERAND_FIELDS[node_type]:
+        key.append(field)
+        continue
+      for operand in as_list(field):
+        operand_key = expression_key(operand)
+        if operand_key is None:
+          return None
+        key.append(operand_key)
+      key.append(None)    # End of the operands of the field
+    return tuple(key)
+
+  return None
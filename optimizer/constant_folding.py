@@ -0,0 +1,86 @@
+from interpreter.lolcode_interpreter import *
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# CONSTANT FOLDING
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that evaluates the expressions made only of literals once, before the program runs.
+# Literals become ConstantNodes with their Value already made, and so do the operations whose
+# operands are all constants. Their result is computed by the Interpreter itself, so the typecasting
+# rules are the same, and an operation that fails (ex. division by zero) is kept as it is, so its
+# error is still reported when it runs.
+class ConstantFolding(NodeTransformer):
+  def __init__(self):
+    self.interpreter = Interpreter()
+
+  # Function to replace a node by the constant it evaluates to (operations don't use the context)
+  def evaluate(self, node):
+    try:
+      result = self.interpreter.visit(node, None)
+    except Exception:
+      return node   # Errors of Python itself (ex. MOD OF by zero) are also left for the run
+
+    if result.error: return node
+    return ConstantNode(result.value)
+
+  # Function to fold an operation, once its operands (the fields in names) are visited
+  def fold(self, node, *names):
+    node = self.generic_visit(node)
+    operands = [operand for name in names for operand in as_list(getattr(node, name))]
+
+    if all(type(operand) is ConstantNode for operand in operands):
+      return self.evaluate(node)
+    return share_operands(node, names)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_IntegerNode(self, node):
+    return self.evaluate(node)
+
+  def visit_FloatNode(self, node):
+    return self.evaluate(node)
+
+  def visit_BooleanNode(self, node):
+    return self.evaluate(node)
+
+  def visit_StringNode(self, node):
+    return self.evaluate(node)
+
+  def visit_NoobNode(self, node):
+    return self.evaluate(node)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_ArithmeticBinaryOpNode(self, node):
+    return self.fold(node, 'left_node', 'right_node')
+
+  def visit_BooleanBinaryOpNode(self, node):
+    return self.fold(node, 'left_node', 'right_node')
+
+  def visit_BooleanUnaryOpNode(self, node):
+    return self.fold(node, 'operand')
+
+  def visit_BooleanTernaryOpNode(self, node):
+    return self.fold(node, 'boolean_statements')
+
+  def visit_ComparisonOpNode(self, node):
+    return self.fold(node, 'left_node', 'right_node')
+
+  def visit_StringConcatNode(self, node):
+    return self.fold(node, 'operands')
+
+  # MAEK A can give back its operand's Value, so its operand is never shared
+  def visit_TypecastNode(self, node):
+    node = self.generic_visit(node)
+    if type(node.source_value) is ConstantNode:
+      return self.evaluate(node)
+    return node
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Statements that only read the values of some of their expressions
+  def visit_PrintNode(self, node):
+    return share_operands(self.generic_visit(node), ('operands',))
+
+  def visit_SwitchCaseNode(self, node):
+    return share_operands(self.generic_visit(node), ('cases',))
+
+  def visit_LoopNode(self, node):
+    return share_operands(self.generic_visit(node), ('til_wile_expression',))
@@ -0,0 +1,108 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# COUNTED LOOPS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that finds the loops that only count: the TIL or WILE guard compares the loop variable to a
+# bound that the body doesn't assign, and every statement of the body is an accumulation like
+# acc R SUM OF acc AN i (see ACCUMULATION_OPERATORS), whose other operand (the term) is the loop
+# variable, a constant or a variable that the body doesn't assign. There's nothing to print, read
+# or break out of, so the number of iterations and the final values can be computed at once (see
+# CountedLoopNode). The Interpreter still runs the loop when the values aren't all NUMBRs.
+
+# Relation between the loop variable and the bound under which the loop continues, for each guard
+# (the relation is negated for TIL, see NEGATED_RELATIONS)
+COMPARISON_RELATIONS = {Operator.BOTH_SAEM: '==', Operator.DIFFRINT: '!='}
+EXTREMUM_RELATIONS = {Operator.SMALLR_OF: '<=', Operator.BIGGR_OF: '>='}
+NEGATED_RELATIONS = {'==': '!=', '!=': '==', '<=': '>', '>': '<=', '>=': '<', '<': '>='}
+
+# Operations that can accumulate (True if the accumulator can also be their second operand)
+ACCUMULATION_OPERATORS = {Operator.SUM_OF: True, Operator.PRODUKT_OF: True, Operator.DIFF_OF: False}
+
+class CountedLoops(NodeTransformer):
+  def visit_LoopNode(self, node):
+    node = self.generic_visit(node)
+    if node.clause_type not in (TIL, WILE):
+      return node   # Only GTFO can end it
+
+    counter_name = node.variable[TOKEN_VALUE]
+    assigned_names = {counter_name}
+    for statement in node.body_statements:
+      if type(statement) is not VarAssignmentNode:
+        return node
+      assigned_names.add(statement.var_to_access[TOKEN_VALUE])
+
+    guard = guard_relation(node.til_wile_expression, counter_name, assigned_names)
+    if guard is None:
+      return node
+    relation, bound_node = guard
+    if node.clause_type == TIL:
+      relation = NEGATED_RELATIONS[relation]
+
+    accumulations = []
+    for statement in node.body_statements:
+      accumulation = accumulation_of(statement, counter_name, assigned_names)
+      if accumulation is None:
+        return node
+      accumulations.append(accumulation)
+
+    # An accumulator that's assigned twice would see its own new value
+    if len(accumulations) != len(assigned_names) - 1:
+      return node
+
+    return CountedLoopNode(node, relation, bound_node, accumulations)
+
+# Function to check if a node is a variable (ex. the loop variable)
+def is_variable(node, name):
+  return type(node) is VarAccessNode and node.var_name_token[TOKEN_VALUE] == name
+
+# Function to check if a node has the same value in every iteration: a constant, or a variable that
+# the loop doesn't assign
+def is_invariant(node, assigned_names):
+  if type(node) is ConstantNode:
+    return True
+  return type(node) is VarAccessNode and node.var_name_token[TOKEN_VALUE] not in assigned_names
+
+# Function to get the (relation, bound node) of a WILE guard, or None if it isn't a comparison of
+# the loop variable to an invariant bound
+def guard_relation(guard, counter_name, assigned_names):
+  if type(guard) is ComparisonOpNode:
+    relation = COMPARISON_RELATIONS[guard.operator]
+    if is_variable(guard.left_node, counter_name) and is_invariant(guard.right_node, assigned_names):
+      return relation, guard.right_node
+    if is_variable(guard.right_node, counter_name) and is_invariant(guard.left_node, assigned_names):
+      return relation, guard.left_node
+
+  elif type(guard) is ExtremumComparisonNode:
+    relation = EXTREMUM_RELATIONS[guard.extremum_operator]
+    if guard.operator == Operator.DIFFRINT:
+      relation = NEGATED_RELATIONS[relation]
+    if is_variable(guard.variable_node, counter_name) and is_invariant(guard.other_node, assigned_names):
+      return relation, guard.other_node
+    if is_variable(guard.other_node, counter_name) and is_invariant(guard.variable_node, assigned_names):
+      return SWAPPED_RELATIONS[relation], guard.variable_node
+
+  return None
+
+# Function to get the accumulation (see CountedLoopNode) of an assignment, or None if it isn't one
+def accumulation_of(statement, counter_name, assigned_names):
+  variable = statement.var_to_access
+  operation = statement.value_to_assign
+  if type(operation) is not ArithmeticBinaryOpNode or operation.operator not in ACCUMULATION_OPERATORS:
+    return None
+
+  if is_variable(operation.left_node, variable[TOKEN_VALUE]):
+    accumulator_first = True
+    term_node = operation.right_node
+  elif ACCUMULATION_OPERATORS[operation.operator] and is_variable(operation.right_node, variable[TOKEN_VALUE]):
+    accumulator_first = False
+    term_node = operation.left_node
+  else:
+    return None
+
+  if is_variable(term_node, counter_name):
+    term_node = None
+  elif not is_invariant(term_node, assigned_names):
+    return None
+
+  return variable, operation.operator, term_node, accumulator_first
@@ -0,0 +1,196 @@
+from interpreter.values import *
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# DEAD CODE
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that removes the statements whose effects are never seen. The output and the symbol table
+# (the variables of the program and IT, which the GUI shows even after an error) stay the same:
+# - a GTFO ends a loop body, an OMG case or a function, so the statements after it never run
+#   (a GTFO in an IF block or an OMGWTF case doesn't stop it, and does nothing there)
+# - only the statements of the program's statement list assign IT, so a constant (ex. a bare 5) is
+#   dead in the other statement lists, and in the program's when the next statement assigns IT
+#   again without reading it or failing first
+# - an O RLY? after a constant only keeps the block that runs (IT keeps that value until it's assigned)
+# - in a function, an assignment to a parameter that isn't read anymore only keeps its expression
+#   (for its errors and its value, which the function returns if it's the last statement)
+# The variables that are never read are still declared, since they're in the symbol table.
+
+CONSTANT_NODE_TYPES = (IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode, ConstantNode)
+IT_READER_NODE_TYPES = (IfNode, SwitchCaseNode, SwitchTableNode)
+
+class DeadCode(NodeTransformer):
+  def visit_root(self, root):
+    if type(root) is list:    # Body of a function parsed when it's called (its parameters aren't known)
+      return function_body(self.visit(root), None)
+    return self.visit(root)
+
+  def visit_StatementListNode(self, node):
+    statements = program_statements(self.visit(node.statements))
+    return node if statements is node.statements else StatementListNode(statements)
+
+  def visit_IfNode(self, node):
+    if_block_statements = block(self.visit(node.if_block_statements), False)
+    else_block_statements = block(self.visit(node.else_block_statements), False)
+    if if_block_statements is node.if_block_statements and else_block_statements is node.else_block_statements:
+      return node
+    return IfNode(if_block_statements, else_block_statements)
+
+  def visit_SwitchCaseNode(self, node):
+    cases_statements = [block(self.visit(statements), True) for statements in node.cases_statements]
+    default_case_statements = block(self.visit(node.default_case_statements), False)
+    if any(map(is_not, cases_statements, node.cases_statements)) or default_case_statements is not node.default_case_statements:
+      return SwitchCaseNode(node.cases, cases_statements, default_case_statements)
+    return node
+
+  def visit_LoopNode(self, node):
+    node = self.generic_visit(node)
+    body_statements = block(node.body_statements, True)
+    if body_statements is node.body_statements:
+      return node
+    return LoopNode(node.label, node.operator, node.variable, node.clause_type, node.til_wile_expression, body_statements)
+
+  def visit_FuncDefNode(self, node):
+    if node.body_statements is None:
+      return node   # Parsed and optimized when it's called
+    parameter_names = {parameter.var_name_token[TOKEN_VALUE] for parameter in node.parameters}
+    body_statements = function_body(self.visit(node.body_statements), parameter_names)
+    if body_statements is node.body_statements:
+      return node
+    return FuncDefNode(node.function_name, node.parameters, body_statements, node.body_tokens)
+
+  def visit_CountedLoopNode(self, node):
+    return node
+
+  def visit_InvariantNode(self, node):
+    return node
+
+def is_constant(statement):
+  return type(statement) in CONSTANT_NODE_TYPES
+
+# Function to keep the same list of statements if none of them changed
+def kept(statements, new_statements):
+  if len(new_statements) == len(statements) and not any(map(is_not, new_statements, statements)):
+    return statements
+  return new_statements
+
+# Function to remove the statements after a GTFO, which ends the statement list
+def reachable(statements):
+  for index, statement in enumerate(statements):
+    if type(statement) is BreakNode:
+      return statements[:index + 1]
+  return statements
+
+# Function to remove the dead statements of a statement list that doesn't assign IT: a loop body or
+# an OMG case (breakable, ended by a GTFO), or an IF block or an OMGWTF case
+def block(statements, breakable):
+  if breakable:
+    new_statements = [statement for statement in reachable(statements) if not is_constant(statement)]
+  else:
+    new_statements = [statement for statement in statements if not is_constant(statement) and type(statement) is not BreakNode]
+  return kept(statements, new_statements)
+
+# Function to remove the dead statements of a function body (the parameter_names are None if they're
+# not known)
+def function_body(statements, parameter_names):
+  statements = reachable(statements)
+  live_names = set()    # Variables that the next statements read
+  new_statements = []
+
+  for index in reversed(range(len(statements))):
+    statement = statements[index]
+    if type(statement) is VarAssignmentNode:
+      name = statement.var_to_access[TOKEN_VALUE]
+      # Only the parameters are variables of the function (assigning another variable fails)
+      if parameter_names is not None and name in parameter_names and name not in live_names:
+        statement = statement.value_to_assign
+      live_names.discard(name)
+    elif type(statement) is InputNode:
+      live_names.discard(statement.variable.var_name_token[TOKEN_VALUE])
+
+    # The value of the last statement is returned
+    if is_constant(statement) and index != len(statements) - 1:
+      continue
+    new_statements.append(statement)
+    live_names |= read_names(statement)
+
+  new_statements.reverse()
+  return kept(statements, new_statements)
+
+# Function to get the names of the variables that a statement reads (including IT, that IF and WTF? read)
+def read_names(statement):
+  names = set()
+  for node in walk(statement):
+    node_type = type(node)
+    if node_type is VarAccessNode:
+      names.add(node.var_name_token[TOKEN_VALUE])
+    elif node_type is LoopNode:
+      names.add(node.variable[TOKEN_VALUE])
+    elif node_type in IT_READER_NODE_TYPES:
+      names.add('IT')
+  return names
+
+# Function to remove the dead statements of the program's statement list, after each of which IT is assigned
+def program_statements(statements):
+  # O RLY? after a constant
+  condition = None    # Value of IT typecast to a TROOF, if it's a known constant
+  new_statements = []
+  for statement in statements:
+    if type(statement) is IfNode and condition is not None:
+      if condition and statement.else_block_statements:
+        statement = IfNode(statement.if_block_statements, [])
+      elif not condition and statement.if_block_statements:
+        statement = IfNode([], statement.else_block_statements)
+
+    if is_constant(statement):
+      condition = constant_condition(statement)
+    elif type(statement) not in IT_READER_NODE_TYPES or changes_it(statement):
+      condition = None    # An IF or a WTF? gives back IT
+    new_statements.append(statement)
+
+  # Constants whose IT is assigned again (the last IT is in the symbol table)
+  it_assigned = False
+  statements_kept = []
+  for statement in reversed(new_statements):
+    if it_assigned and is_constant(statement):
+      continue
+    statements_kept.append(statement)
+    it_assigned = assigns_it(statement)
+  statements_kept.reverse()
+  return kept(statements, statements_kept)
+
+# Function to get the value of a constant typecast to a TROOF (like by O RLY?), or None if it fails
+def constant_condition(statement):
+  if type(statement) is not ConstantNode or not isinstance(statement.value, Value):
+    return None   # Literal that isn't folded, or string of a SMOOSH
+  condition, error = statement.value.typecast(Boolean)
+  return None if error else condition.value
+
+# Function to check if a statement can change IT (a loop changes the value of its variable in place,
+# and so can a function with a loop on a parameter)
+def changes_it(statement):
+  for node in walk(statement):
+    node_type = type(node)
+    if node_type is VarAssignmentNode and node.var_to_access[TOKEN_VALUE] == 'IT':
+      return True
+    if node_type is VarDeclarationNode and node.var_name_token[TOKEN_VALUE] == 'IT':
+      return True
+    if node_type is InputNode and node.variable.var_name_token[TOKEN_VALUE] == 'IT':
+      return True
+    if node_type is LoopNode and node.variable[TOKEN_VALUE] == 'IT':
+      return True
+    if node_type is FuncCallNode:
+      return True
+  return False
+
+# Function to check if a statement of the program's statement list always assigns IT without reading
+# it first (it can't fail)
+def assigns_it(statement):
+  statement_type = type(statement)
+  if statement_type in CONSTANT_NODE_TYPES or statement_type in (BreakNode, FuncDefNode):
+    return True
+  if statement_type is PrintNode:
+    return all(map(is_constant, statement.operands))
+  if statement_type is VarDeclarationNode:
+    return is_constant(statement.value_node)
+  return False
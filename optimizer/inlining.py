@@ -0,0 +1,89 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# INLINING
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that runs the body of a small function at its calls (I IZ) instead of calling it, which
+# makes a Function's Interpreter, context and symbol table for each call (see Function.execute()).
+# A small function only prints (VISIBLE) and computes expressions of its parameters: a function
+# can only read its own variables, so it can't call another function (or itself), and its body
+# runs the same way in the context of the call once its parameters are replaced by the arguments.
+# The parameters become ParameterNodes that read the arguments of the call from a list of the
+# function, so they can't collide with the variables of the caller and never reach its symbol table.
+# Every call still looks the function up, and the call is made as it is if the name was given
+# another value (ex. a function defined twice).
+
+INLINED_NODE_LIMIT = 40   # Nodes in the body of a small function
+INLINED_NODE_TYPES = frozenset((
+  IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode, VarAccessNode, TypecastNode, PrintNode,
+  ConstantNode, CommonNode, *OPERAND_FIELDS,
+))
+
+class Inlining(NodeTransformer):
+  def visit_root(self, root):
+    if type(root) is list:
+      return root   # Body of a function parsed when it's called (its calls can only call its parameters)
+
+    definitions = {}    # Function definition of each name (None if there's more than one)
+    for node in walk(root):
+      if type(node) is FuncDefNode:
+        name = node.function_name[TOKEN_VALUE]
+        definitions[name] = None if name in definitions else node
+
+    self.inlined_functions = {}
+    for name, definition in definitions.items():
+      if definition is not None:
+        inlined_function = inline_function(definition)
+        if inlined_function is not None:
+          self.inlined_functions[name] = inlined_function
+
+    return self.visit(root)
+
+  def visit_FuncCallNode(self, node):
+    node = self.generic_visit(node)
+    if type(node.function_name) is not VarAccessNode:
+      return node
+    inlined_function = self.inlined_functions.get(node.function_name.var_name_token[TOKEN_VALUE])
+    if inlined_function is None:
+      return node
+
+    function_body, body_statements, values = inlined_function
+    if len(node.parameters) != len(values):
+      return node   # Too many or too few arguments (an error of the call)
+    return InlinedCallNode(node, function_body, body_statements, values)
+
+  # The calls in a function can only call its parameters
+  def visit_FuncDefNode(self, node):
+    return node
+
+# Function to get the (body, body with ParameterNodes, list of the arguments) of a function whose calls
+# can be inlined, or None if it isn't small
+def inline_function(definition):
+  body_statements = definition.body_statements
+  if body_statements is None:
+    return None   # Parsed when it's called
+  if not all(type(parameter) is VarAccessNode for parameter in definition.parameters):
+    return None
+
+  # A parameter that's repeated has the last argument that's passed for it
+  indices = {parameter.var_name_token[TOKEN_VALUE]: index for index, parameter in enumerate(definition.parameters)}
+  node_count = 0
+  for node in walk(body_statements):
+    node_count += 1
+    if node_count > INLINED_NODE_LIMIT or type(node) not in INLINED_NODE_TYPES:
+      return None
+    if type(node) is VarAccessNode and node.var_name_token[TOKEN_VALUE] not in indices:
+      return None   # The call would fail
+
+  values = [None] * len(definition.parameters)
+  return body_statements, ParameterSubstitution(indices, values).visit(body_statements), values
+
+# Transformer that replaces the parameters of a function by ParameterNodes
+class ParameterSubstitution(NodeTransformer):
+  def __init__(self, indices, values):
+    self.indices = indices
+    self.values = values
+
+  def visit_VarAccessNode(self, node):
+    name = node.var_name_token[TOKEN_VALUE]
+    return ParameterNode(name, self.values, self.indices[name])
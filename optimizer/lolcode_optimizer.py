@@ -0,0 +1,39 @@
+from .nodes import *
+from .node_transformer import *
+from .constant_folding import *
+from .short_circuit import *
+from .dead_code import *
+from .peephole import *
+from .counted_loops import *
+from .loop_invariants import *
+from .common_subexpressions import *
+from .switch_tables import *
+from .inlining import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPTIMIZER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Passes that rewrite the AST between the parser and the interpreter (see run_lolcode_ast()).
+# A pass never changes the nodes it's given, since the same tree can still be used by the parse
+# cache or an IncrementalFrontEnd: it makes new nodes for the parts it rewrites and shares the rest.
+class Optimizer:
+  def __init__(self, passes=None):
+    if passes is None:
+      passes = [
+        ConstantFolding, ShortCircuit, DeadCode, Peephole, CountedLoops, LoopInvariants, CommonSubexpressions,
+        SwitchTables, Inlining,
+      ]
+    self.passes = list(passes)
+
+  # Function to optimize a program (or any node, or a list of statements)
+  def optimize(self, program):
+    try:
+      for optimization_pass in self.passes:
+        program = optimization_pass().visit_root(program)
+    except RecursionError:
+      pass    # Too deeply nested to optimize (the passes that finished are kept)
+
+    return program
+
+  def __repr__(self):
+    return f"Optimizer({[optimization_pass.__name__ for optimization_pass in self.passes]})"
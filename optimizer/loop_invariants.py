@@ -0,0 +1,135 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# LOOP INVARIANTS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that finds the expressions in a loop (its guard and body, and the loops in it) whose value is
+# the same in every iteration: operations on constants and on variables that the loop never assigns.
+# Each one is only evaluated once each time the loop runs (see InvariantLoopNode).
+# An invariant is evaluated where it first runs instead of before the loop, so an invariant that fails,
+# or that the loop never reaches, still fails (or doesn't) at the same point.
+# The pass is conservative: it leaves the loops that call functions (I IZ), read input (GIMMEH) or
+# define functions alone, since they could change the variables in ways the pass doesn't see.
+
+LITERAL_NODE_TYPES = (IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode, ConstantNode, InvariantNode)
+SIDE_EFFECT_NODE_TYPES = (FuncCallNode, InputNode, FuncDefNode)
+
+class LoopInvariants(NodeTransformer):
+  def visit_LoopNode(self, node):
+    effects = loop_effects(node)
+    if effects is None:
+      return self.generic_visit(node)
+
+    assigned_names, loop_variable_names = effects
+    hoisting = InvariantHoisting(assigned_names)
+    hoisted_loop = hoisting.visit(node)
+    if not hoisting.values:
+      return self.generic_visit(node)
+
+    # The loops in the hoisted loop can still have their own invariants
+    return InvariantLoopNode(
+      self.generic_visit(node), self.generic_visit(hoisted_loop), hoisting.values,
+      sorted(loop_variable_names), sorted(hoisting.read_names),
+    )
+
+  def visit_CountedLoopNode(self, node):
+    return node
+
+  def visit_InvariantNode(self, node):
+    return node
+
+# Function to get the (names of the variables assigned in a loop, names of the loop variables of
+# the loop and of the loops in it), or None if the loop has side effects or assigns a loop variable
+def loop_effects(loop):
+  assigned_names = set()
+  loop_variable_names = set()
+
+  for node in walk(loop):
+    node_type = type(node)
+    if node_type in SIDE_EFFECT_NODE_TYPES:
+      return None
+    if node_type is LoopNode:
+      loop_variable_names.add(node.variable[TOKEN_VALUE])
+    elif node_type is VarAssignmentNode:
+      assigned_names.add(node.var_to_access[TOKEN_VALUE])
+    elif node_type is VarDeclarationNode:
+      assigned_names.add(node.var_name_token[TOKEN_VALUE])
+
+  if assigned_names & loop_variable_names:
+    return None
+  return assigned_names | loop_variable_names, loop_variable_names
+
+# Transformer that replaces the largest invariant expressions of a loop by InvariantNodes
+class InvariantHoisting(NodeTransformer):
+  def __init__(self, assigned_names):
+    self.assigned_names = assigned_names
+    self.values = []          # Values of the InvariantNodes (see InvariantNode)
+    self.read_names = set()   # Variables that the InvariantNodes read
+
+  def is_invariant(self, node):
+    node_type = type(node)
+    if node_type is VarAccessNode:
+      return node.var_name_token[TOKEN_VALUE] not in self.assigned_names
+    if node_type in LITERAL_NODE_TYPES:
+      return True
+    if node_type is TypecastNode:
+      return self.is_invariant(node.source_value)
+    if node_type in OPERAND_FIELDS:
+      return all(
+        self.is_invariant(operand) for name in OPERAND_FIELDS[node_type] for operand in as_list(getattr(node, name))
+      )
+    return False
+
+  # Function to hoist an operation if it's invariant, or the invariant expressions in it
+  def hoist(self, node):
+    if not self.is_invariant(node):
+      return share_operands(self.generic_visit(node), OPERAND_FIELDS[type(node)])
+
+    self.read_names.update(child.var_name_token[TOKEN_VALUE] for child in walk(node) if type(child) is VarAccessNode)
+    self.values.append(None)
+    return InvariantNode(node, self.values, len(self.values) - 1)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  def visit_ArithmeticBinaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_BooleanBinaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_BooleanUnaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_BooleanTernaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_ComparisonOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_StringConcatNode(self, node):
+    return self.hoist(node)
+
+  def visit_ShortCircuitBinaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_ShortCircuitTernaryOpNode(self, node):
+    return self.hoist(node)
+
+  def visit_ExtremumComparisonNode(self, node):
+    return self.hoist(node)
+
+  # ───────────────────────────────────────────────────────────────────────────────────────────────
+  # Statements that only read the values of some of their expressions
+  def visit_PrintNode(self, node):
+    return share_operands(self.generic_visit(node), ('operands',))
+
+  def visit_SwitchCaseNode(self, node):
+    return share_operands(self.generic_visit(node), ('cases',))
+
+  def visit_LoopNode(self, node):
+    return share_operands(self.generic_visit(node), ('til_wile_expression',))
+
+  def visit_CountedLoopNode(self, node):
+    return node
+
+  def visit_InvariantNode(self, node):
+    return node
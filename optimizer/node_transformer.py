@@ -0,0 +1,105 @@
+from operator import is_not
+from parser.flat_ast import NODE_TYPES
+from .nodes import *
+
+NODE_CLASSES = frozenset(NODE_TYPES + OPTIMIZER_NODE_TYPES)
+
+# Operations with the fields of their operands (which they only read, see share_operands())
+OPERAND_FIELDS = {
+  ArithmeticBinaryOpNode: ('left_node', 'right_node'),
+  BooleanBinaryOpNode: ('left_node', 'right_node'),
+  BooleanUnaryOpNode: ('operand',),
+  BooleanTernaryOpNode: ('boolean_statements',),
+  ComparisonOpNode: ('left_node', 'right_node'),
+  StringConcatNode: ('operands',),
+  ShortCircuitBinaryOpNode: ('left_node', 'right_node'),
+  ShortCircuitTernaryOpNode: ('boolean_statements',),
+  ExtremumComparisonNode: ('variable_node', 'other_node'),
+}
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# NODE TRANSFORMER
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Base class of the optimization passes.
+# Like the Interpreter, visit() dispatches to a visit_<node class> method, and nodes without one are
+# rebuilt by generic_visit() from their visited fields. A visit returns the node itself when nothing
+# in it changed, so unchanged subtrees are shared with the original tree (which is never modified).
+class NodeTransformer:
+  visitors = {}   # Method that visits each node class (and list), made for each pass class
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    cls.visitors = {node_type: getattr(cls, f'visit_{node_type.__name__}', cls.generic_visit) for node_type in NODE_CLASSES}
+    cls.visitors[list] = cls.visit_list
+
+  # Function to visit the root of a tree: a program (or any node), or the list of statements of a
+  # function whose body is parsed when it's called (see Function.parse_body())
+  def visit_root(self, root):
+    return self.visit(root)
+
+  def visit(self, value):
+    visitor = self.visitors.get(type(value))
+    if visitor is None:
+      return value    # Tokens, operators, labels, ...
+    return visitor(self, value)
+
+  def visit_list(self, items):
+    new_items = [self.visit(item) for item in items]
+    return new_items if any(map(is_not, new_items, items)) else items
+
+  def generic_visit(self, node):
+    fields = [getattr(node, name) for name in type(node).__slots__]
+    new_fields = [self.visit(field) for field in fields]
+    if any(map(is_not, new_fields, fields)):
+      return copy_node(node, new_fields)
+    return node
+
+# Function to make a node of the same class as node with other fields (in the order of its __slots__)
+def copy_node(node, fields):
+  node_type = type(node)
+  new_node = object.__new__(node_type)
+  for name, field in zip(node_type.__slots__, fields):
+    setattr(new_node, name, field)
+  return new_node
+
+# Function to get the nodes of a tree (the root, its children, their children, and so on)
+# The tree is walked with an explicit stack, like in FlatAST.from_node().
+def walk(root):
+  work = [root]
+
+  while work:
+    value = work.pop()
+    if type(value) is list:
+      work.extend(value)
+    elif type(value) in NODE_CLASSES:
+      yield value
+      work.extend(getattr(value, name) for name in type(value).__slots__)
+
+def as_list(field):
+  return field if type(field) is list else [field]
+
+# Function to share the constants (and invariants) in some fields of a node (the ones that are only
+# used to compute another value, see ConstantNode)
+def share_operands(node, names):
+  fields = []
+  for name in type(node).__slots__:
+    field = getattr(node, name)
+    if name in names:
+      if type(field) is list:
+        items = [share(item) for item in field]
+        if any(item is not old_item for item, old_item in zip(items, field)):
+          field = items
+      else:
+        field = share(field)
+    fields.append(field)
+
+  if all(field is getattr(node, name) for name, field in zip(type(node).__slots__, fields)):
+    return node
+  return copy_node(node, fields)
+
+def share(operand):
+  if type(operand) is ConstantNode and not operand.shared:
+    return ConstantNode(operand.value, True)
+  if type(operand) is InvariantNode and not operand.shared:
+    return InvariantNode(operand.expression, operand.values, operand.index, True)
+  return operand
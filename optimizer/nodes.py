@@ -0,0 +1,238 @@
+from math import prod
+from parser.nodes import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPTIMIZER NODES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Nodes that are only made by the optimizer (never by the parser, so they're not part of FlatAST's
+# NODE_TYPES and never reach the parse cache).
+
+# Expression that was already evaluated (see ConstantFolding)
+# The value is what the Interpreter gets by visiting the original expression (a Value, or the
+# string of a SMOOSH). Values can be kept by variables and changed in place (ex. by a loop), so
+# each evaluation gets a copy of it, unless it's shared: an operand that is only used to compute
+# another value (ex. of SUM OF or VISIBLE) always gets the same Value.
+class ConstantNode:
+  __slots__ = ('value', 'shared')
+
+  def __init__(self, value, shared=False):
+    self.value = value
+    self.shared = shared
+
+  def __repr__(self):
+    return f'Constant({self.value!r})'
+
+# BOTH OF or EITHER OF that only evaluates its right operand if the left one doesn't decide the
+# result (see ShortCircuit)
+class ShortCircuitBinaryOpNode:
+  __slots__ = ('operator', 'left_node', 'right_node')
+
+  def __init__(self, left_node, operator, right_node):
+    self.operator = operator
+    self.left_node = left_node
+    self.right_node = right_node
+
+  def __repr__(self):
+    return f'{self.operator.keyword}({self.left_node}, {self.right_node})'
+
+# ALL OF or ANY OF that stops evaluating its operands once one of them decides the result
+class ShortCircuitTernaryOpNode:
+  __slots__ = ('operator', 'boolean_statements')
+
+  def __init__(self, operator, boolean_statements):
+    self.operator = operator
+    self.boolean_statements = boolean_statements
+
+  def __repr__(self):
+    return f"{self.operator.keyword}({self.boolean_statements})"
+
+# BOTH SAEM or DIFFRINT between a variable and the SMALLR OF or BIGGR OF that variable and another
+# operand (see Peephole), ex. BOTH SAEM x AN SMALLR OF x AN y (x <= y) or BOTH SAEM BIGGR OF x AN y AN x
+# (x >= y). The variable is only looked up once. variable_first tells which operand of the comparison
+# the variable is, since the other one is typecast to its type.
+class ExtremumComparisonNode:
+  __slots__ = ('operator', 'variable_node', 'extremum_operator', 'other_node', 'variable_first')
+
+  def __init__(self, operator, variable_node, extremum_operator, other_node, variable_first):
+    self.operator = operator
+    self.variable_node = variable_node
+    self.extremum_operator = extremum_operator
+    self.other_node = other_node
+    self.variable_first = variable_first
+
+  def __repr__(self):
+    extremum = f"{self.extremum_operator.keyword}({self.variable_node}, {self.other_node})"
+    if self.variable_first:
+      return f"{self.operator.keyword}({self.variable_node}, {extremum})"
+    return f"{self.operator.keyword}({extremum}, {self.variable_node})"
+
+# Relation between 2 values that holds after swapping them (see CountedLoopNode)
+SWAPPED_RELATIONS = {'==': '==', '!=': '!=', '<=': '>=', '>=': '<=', '<': '>', '>': '<'}
+
+# Loop that only counts (see CountedLoops), with the relation between the loop variable and the
+# bound under which it continues, and the accumulations of its body. An accumulation is (accumulator
+# variable token, operator, term node or None for the loop variable, True if the accumulator is the
+# first operand).
+class CountedLoopNode:
+  __slots__ = ('loop', 'relation', 'bound_node', 'accumulations')
+
+  def __init__(self, loop, relation, bound_node, accumulations):
+    self.loop = loop
+    self.relation = relation
+    self.bound_node = bound_node
+    self.accumulations = accumulations
+
+  # Function to get the number of iterations of the loop from the start and bound (integers) and the
+  # step (1 for UPPIN or -1 for NERFIN), or None if it never ends
+  # The loop variable is start + step * iteration, so the relation is checked on the iteration and
+  # the distance from the start to the bound (in the direction of the step).
+  def iteration_count(self, start, bound, step):
+    relation = self.relation if step > 0 else SWAPPED_RELATIONS[self.relation]
+    distance = (bound - start) * step
+
+    if relation == '==':
+      return 1 if distance == 0 else 0
+    if relation == '!=':
+      return distance if distance >= 0 else None
+    if relation == '<=':
+      return distance + 1 if distance >= 0 else 0
+    if relation == '<':
+      return max(distance, 0)
+    if relation == '>=':
+      return None if distance <= 0 else 0
+    return None if distance < 0 else 0   # '>'
+
+  # Function to apply count iterations of an accumulation to an integer, where the term is the
+  # integer term, or None for the loop variable (an integer going from start by step)
+  def accumulate(self, operator, value, term, start, step, count):
+    if operator == Operator.PRODUKT_OF:
+      if term is None:
+        return value * prod(range(start, start + step * count, step))
+      return value * term ** count
+
+    if term is None:
+      total = count * start + step * count * (count - 1) // 2
+    else:
+      total = count * term
+    return value + total if operator == Operator.SUM_OF else value - total
+
+  def __repr__(self):
+    return f"CountedLoop({self.loop.label}, {self.relation}, {self.bound_node}, {self.accumulations})"
+
+# Expression in a loop that has the same value in every iteration (see LoopInvariants). It's
+# evaluated the first time it's reached, and its value is kept in values[index] (a list shared with
+# its InvariantLoopNode, which empties it each time the loop starts). Like for a ConstantNode, each
+# evaluation gets a copy of the value unless it's shared.
+class InvariantNode:
+  __slots__ = ('expression', 'values', 'index', 'shared')
+
+  def __init__(self, expression, values, index, shared=False):
+    self.expression = expression
+    self.values = values
+    self.index = index
+    self.shared = shared
+
+  def __repr__(self):
+    return f"Invariant({self.expression})"
+
+# Loop whose invariant expressions are only evaluated once each time it runs (see LoopInvariants).
+# The hoisted_loop is the loop with InvariantNodes, and the loop is run as it is when a variable that
+# the invariants read has the same value as a loop variable (the loops change it in place).
+class InvariantLoopNode:
+  __slots__ = ('loop', 'hoisted_loop', 'values', 'loop_variable_names', 'read_names')
+
+  def __init__(self, loop, hoisted_loop, values, loop_variable_names, read_names):
+    self.loop = loop
+    self.hoisted_loop = hoisted_loop
+    self.values = values
+    self.loop_variable_names = loop_variable_names
+    self.read_names = read_names
+
+  def __repr__(self):
+    return f"InvariantLoop({self.hoisted_loop})"
+
+# Expression that is computed again in a statement list while the variables it reads keep their
+# values (see CommonSubexpressions). The first one (defining) is evaluated and keeps its value in
+# values[index] (a list shared by the CommonNodes of the statement list), and the next ones give it
+# back. Like for a ConstantNode, each one gets a copy of the value unless it's shared.
+class CommonNode:
+  __slots__ = ('expression', 'values', 'index', 'defining', 'shared')
+
+  def __init__(self, expression, values, index, defining, shared=False):
+    self.expression = expression
+    self.values = values
+    self.index = index
+    self.defining = defining
+    self.shared = shared
+
+  def __repr__(self):
+    return f"Common{self.index}({self.expression})" if self.defining else f"Common{self.index}"
+
+# WTF? whose OMG cases are all constants, with a table of them for each type that IT can have (see
+# SwitchTables). A table is (index of the first case of each value, index of the first case that
+# can't be typecast to the type, its error), and it's made the first time IT has that type (a switch
+# that only runs once would spend more time making its tables than comparing its cases). The
+# switch_case is visited as it is when IT has a type without a table.
+class SwitchTableNode:
+  __slots__ = ('switch_case', 'case_tables')
+
+  def __init__(self, switch_case, basis_types):
+    self.switch_case = switch_case
+    self.case_tables = dict.fromkeys(basis_types)
+
+  # Function to get the table of the cases for an IT of one of the basis types
+  def case_table(self, basis_type):
+    case_table = self.case_tables[basis_type]
+    if case_table is not None:
+      return case_table
+
+    cases = self.switch_case.cases
+    case_indices = {}
+    error_index = len(cases)
+    error = None
+
+    for index, case in enumerate(cases):
+      case_value, error = case.value.typecast(basis_type)
+      if error:
+        error_index = index
+        break
+      case_indices.setdefault(case_value.value, index)
+
+    case_table = self.case_tables[basis_type] = (case_indices, error_index, error)
+    return case_table
+
+  def __repr__(self):
+    return f"SwitchTable({self.switch_case})"
+
+# Parameter of a function whose calls are inlined (see Inlining): the argument that the call passed,
+# in values[index] (a list shared by the parameters and calls of the function)
+class ParameterNode:
+  __slots__ = ('name', 'values', 'index')
+
+  def __init__(self, name, values, index):
+    self.name = name
+    self.values = values
+    self.index = index
+
+  def __repr__(self):
+    return f"Parameter({self.name})"
+
+# Call of a small function whose body_statements (with ParameterNodes, see Inlining) are run in the
+# context of the call, without making the Function's context and symbol table. The function_body is
+# the body of the FuncDefNode, and the call is made as it is when the name is given another Function.
+class InlinedCallNode:
+  __slots__ = ('call', 'function_body', 'body_statements', 'values')
+
+  def __init__(self, call, function_body, body_statements, values):
+    self.call = call
+    self.function_body = function_body
+    self.body_statements = body_statements
+    self.values = values
+
+  def __repr__(self):
+    return f"Inlined({self.call})"
+
+OPTIMIZER_NODE_TYPES = (
+  ConstantNode, ShortCircuitBinaryOpNode, ShortCircuitTernaryOpNode, ExtremumComparisonNode, CountedLoopNode,
+  InvariantNode, InvariantLoopNode, CommonNode, SwitchTableNode, ParameterNode, InlinedCallNode,
+)
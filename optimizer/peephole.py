@@ -0,0 +1,35 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# PEEPHOLE
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that rewrites the idioms that LOLCODE programs use instead of <, <=, > and >= (ex. in loop
+# guards like WILE BOTH SAEM x AN SMALLR OF x AN y) into ExtremumComparisonNodes. Only a variable is
+# rewritten, since looking it up twice gives the same value (the other operand can't assign it).
+EXTREMUM_OPERATORS = (Operator.SMALLR_OF, Operator.BIGGR_OF)
+
+class Peephole(NodeTransformer):
+  def visit_ComparisonOpNode(self, node):
+    node = self.generic_visit(node)
+
+    # BOTH SAEM x AN SMALLR OF x AN y
+    if is_extremum_of(node.right_node, node.left_node):
+      extremum = node.right_node
+      return ExtremumComparisonNode(node.operator, node.left_node, extremum.operator, extremum.right_node, True)
+
+    # BOTH SAEM SMALLR OF x AN y AN x
+    if is_extremum_of(node.left_node, node.right_node):
+      extremum = node.left_node
+      return ExtremumComparisonNode(node.operator, node.right_node, extremum.operator, extremum.right_node, False)
+
+    return node
+
+# Function to check if a node is the SMALLR OF or BIGGR OF a variable (as its first operand) and another operand
+def is_extremum_of(node, variable_node):
+  return (
+    type(node) is ArithmeticBinaryOpNode
+    and node.operator in EXTREMUM_OPERATORS
+    and type(variable_node) is VarAccessNode
+    and type(node.left_node) is VarAccessNode
+    and node.left_node.var_name_token[TOKEN_VALUE] == variable_node.var_name_token[TOKEN_VALUE]
+  )
@@ -0,0 +1,18 @@
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# SHORT-CIRCUIT EVALUATION
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that makes BOTH OF, EITHER OF, ALL OF and ANY OF stop evaluating their operands once the
+# result is known (ex. BOTH OF FAIL AN I IZ f MKAY never calls f), including in the TIL and WILE
+# guards of loops. The operands that are evaluated are typecast (and their errors reported) as before.
+class ShortCircuit(NodeTransformer):
+  def visit_BooleanBinaryOpNode(self, node):
+    node = self.generic_visit(node)
+    if node.operator in (Operator.BOTH_OF, Operator.EITHER_OF):
+      return ShortCircuitBinaryOpNode(node.left_node, node.operator, node.right_node)
+    return node
+
+  def visit_BooleanTernaryOpNode(self, node):
+    node = self.generic_visit(node)
+    return ShortCircuitTernaryOpNode(node.operator, node.boolean_statements)
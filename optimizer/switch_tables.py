@@ -0,0 +1,21 @@
+from interpreter.values import *
+from .node_transformer import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# SWITCH TABLES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Pass that lets a WTF? find its OMG case with a dict lookup instead of comparing IT to each case.
+# The Interpreter compares IT to a case by typecasting the case to the type of IT, so the cases are
+# typecast to each type of IT once, and a table maps each typecast value to the first case that has
+# it (see SwitchTableNode). The cases are compared in order, so a case that can't be typecast to the
+# type (an error) hides the cases after it: the table keeps its index, and the lookup reports its
+# error when no case before it matches, like the Interpreter does.
+BASIS_TYPES = (Number, String, Boolean, Noob)
+
+class SwitchTables(NodeTransformer):
+  def visit_SwitchCaseNode(self, node):
+    node = self.generic_visit(node)
+    if not all(type(case) is ConstantNode for case in node.cases):
+      return node   # A case is a variable
+
+    return SwitchTableNode(node, BASIS_TYPES)
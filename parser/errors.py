@@ -16,4 +16,10 @@ class InvalidSyntaxError(Error):
 class RuntimeError(Error):
   def __init__(self, token, details):
     super().__init__(token, details, error_name='Runtime Error')
-    
\ No newline at end of file
+
+# Raised by the parser's productions on a syntax error (Parser.parse() catches it, and returns its
+# InvalidSyntaxError in the ParseResult)
+class ParseError(Exception):
+  def __init__(self, token, details):
+    self.error = InvalidSyntaxError(token, details)
+    super().__init__(self.error.as_string())
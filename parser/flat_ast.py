@@ -0,0 +1,159 @@
+import marshal
+from array import array
+from .nodes import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# FLAT AST
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Array-encoded form of a parsed program (see Parser.parse(flat=True)).
+# Instead of a graph of node objects, the nodes are kept in contiguous columns:
+#   kinds     the kind of each node (its index in NODE_TYPES)
+#   starts    where the fields of each node start in fields (a node has one field per slot, in
+#             the order of its class' __slots__)
+#   fields    the encoded fields of every node
+#   children  the encoded lists, each one stored as its length followed by its items
+#   constants the pool of the literal values, tokens, labels, ... (each distinct value only once)
+# An encoded field or list item is an integer whose two lowest bits tell what it refers to (see
+# the FIELD_* constants) and the rest is the index of a node, a list offset, a constant or an
+# operator.
+# The nodes are stored children first, so the node of the whole program is the last one and the
+# nodes can be rebuilt in a single pass over the columns (see to_node()).
+
+# Node kinds (only append to this, since the index of a node type is part of the encoded form)
+NODE_TYPES = (
+  IntegerNode, FloatNode, BooleanNode, StringNode, NoobNode, StringConcatNode, ArithmeticBinaryOpNode,
+  BooleanBinaryOpNode, BooleanUnaryOpNode, BooleanTernaryOpNode, ComparisonOpNode, VarAccessNode,
+  VarDeclarationNode, VarAssignmentNode, StatementListNode, VarDecListNode, PrintNode, TypecastNode,
+  SwitchCaseNode, IfNode, LoopNode, FuncDefNode, FuncCallNode, InputNode, BreakNode, ProgramNode,
+)
+NODE_KINDS = {node_type: kind for kind, node_type in enumerate(NODE_TYPES)}
+OPERATOR_VALUES = {int(operator): operator for operator in Operator}
+
+# What an encoded field refers to
+FIELD_NODE = 0
+FIELD_LIST = 1
+FIELD_CONSTANT = 2
+FIELD_OPERATOR = 3
+FIELD_BITS = 2
+FIELD_MASK = (1 << FIELD_BITS) - 1
+
+class FlatAST:
+  def __init__(self):
+    self.kinds = array('B')
+    self.starts = array('I')
+    self.fields = array('Q')
+    self.children = array('Q')
+    self.constants = []
+
+  # Function to encode a tree of nodes
+  # The tree is walked with an explicit stack (ex. deeply nested expressions don't hit the recursion limit).
+  @classmethod
+  def from_node(cls, root):
+    flat = cls()
+    constant_indices = {}   # (type, value) to index in constants (so 1, 1.0 and WIN don't share an entry)
+    encoded = []            # Encoded values of the finished fields and list items
+    work = [(root, False)]  # (value, whether its fields or items are already encoded)
+
+    while work:
+      value, is_encoded = work.pop()
+      value_type = type(value)
+
+      if value_type in NODE_KINDS:
+        if is_encoded:
+          field_count = len(value_type.__slots__)
+          index = len(flat.kinds)
+          flat.kinds.append(NODE_KINDS[value_type])
+          flat.starts.append(len(flat.fields))
+          if field_count:
+            flat.fields.extend(encoded[-field_count:])
+            del encoded[-field_count:]
+          encoded.append(index << FIELD_BITS | FIELD_NODE)
+        else:
+          work.append((value, True))
+          work.extend((getattr(value, name), False) for name in reversed(value_type.__slots__))
+
+      elif value_type is list:
+        if is_encoded:
+          offset = len(flat.children)
+          flat.children.append(len(value))
+          if value:
+            flat.children.extend(encoded[-len(value):])
+            del encoded[-len(value):]
+          encoded.append(offset << FIELD_BITS | FIELD_LIST)
+        else:
+          work.append((value, True))
+          work.extend((item, False) for item in reversed(value))
+
+      elif value_type is Operator:
+        encoded.append(value << FIELD_BITS | FIELD_OPERATOR)
+
+      else:
+        key = (value_type, value)
+        index = constant_indices.get(key)
+        if index is None:
+          index = constant_indices[key] = len(flat.constants)
+          flat.constants.append(value)
+        encoded.append(index << FIELD_BITS | FIELD_CONSTANT)
+
+    return flat
+
+  # Function to rebuild the tree of nodes (for the Interpreter)
+  def to_node(self):
+    nodes = []
+    fields = self.fields
+    constants = self.constants
+    new_node = object.__new__
+
+    for kind, start in zip(self.kinds, self.starts):
+      node_type = NODE_TYPES[kind]
+      node = new_node(node_type)
+      for name, value in zip(node_type.__slots__, fields[start:start + len(node_type.__slots__)]):
+        # Node and constant fields are decoded here (they're most of them), and the rest by decode()
+        field_type = value & FIELD_MASK
+        if field_type == FIELD_NODE:
+          setattr(node, name, nodes[value >> FIELD_BITS])
+        elif field_type == FIELD_CONSTANT:
+          setattr(node, name, constants[value >> FIELD_BITS])
+        else:
+          setattr(node, name, self.decode(value, nodes))
+      nodes.append(node)
+
+    return nodes[-1] if nodes else None
+
+  def decode(self, value, nodes):
+    field_type = value & FIELD_MASK
+    index = value >> FIELD_BITS
+
+    if field_type == FIELD_NODE:
+      return nodes[index]
+    elif field_type == FIELD_CONSTANT:
+      return self.constants[index]
+    elif field_type == FIELD_OPERATOR:
+      return OPERATOR_VALUES[index]
+    else:
+      length = self.children[index]
+      return [self.decode(item, nodes) for item in self.children[index + 1:index + 1 + length]]
+
+  # Function to serialize the columns (the arrays are stored in the machine's byte order)
+  def to_bytes(self):
+    return marshal.dumps((
+      self.kinds.tobytes(), self.starts.tobytes(), self.fields.tobytes(), self.children.tobytes(),
+      tuple(self.constants),
+    ))
+
+  @classmethod
+  def from_bytes(cls, data):
+    kinds, starts, fields, children, constants = marshal.loads(data)
+    flat = cls()
+    flat.kinds.frombytes(kinds)
+    flat.starts.frombytes(starts)
+    flat.fields.frombytes(fields)
+    flat.children.frombytes(children)
+    flat.constants = list(constants)
+    return flat
+
+  def __len__(self):
+    return len(self.kinds)
+
+  def __repr__(self):
+    return f"FlatAST({len(self)} nodes, {len(self.constants)} constants)"
@@ -0,0 +1,186 @@
+from lexer.lolcode_lexer import *
+from .lolcode_parser import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL FRONT END
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Front end for a source that keeps being edited (ex. in the GUI's editor). It keeps the tokens and
+# the top-level statements of the last source it parsed, and after an edit:
+# - only the damaged part of the source is lexed again (see relex())
+# - only the top-level statements (or functions) whose tokens changed are parsed again: parsing
+#   restarts at the first statement that looked at a changed token, and stops at the first
+#   statement boundary after the edit that is also an old statement boundary (the statements after
+#   it see the same tokens, so they're the same).
+# The statements after the edit are reused as they are, and the line numbers they keep are only
+# moved (by the number of lines the edit added or removed) when the program is requested.
+# The results (program node and error) are the same as lexing and parsing the whole source.
+BLOCK_SIZE = 4096
+
+# Function to get the length of the common prefix of 2 strings (compared a block at a time)
+def common_prefix_length(a, b):
+  limit = min(len(a), len(b))
+  start = 0
+  while start < limit and a[start:start + BLOCK_SIZE] == b[start:start + BLOCK_SIZE]:
+    start += BLOCK_SIZE
+  end = min(start + BLOCK_SIZE, limit)
+  while start < end and a[start] == b[start]:
+    start += 1
+  return min(start, limit)
+
+# Function to get the length of the common suffix of 2 strings, up to limit characters
+def common_suffix_length(a, b, limit):
+  length = 0
+  while length < limit:
+    size = min(BLOCK_SIZE, limit - length)
+    if a[len(a) - length - size:len(a) - length] != b[len(b) - length - size:len(b) - length]:
+      break
+    length += size
+  else:
+    return limit
+
+  while a[len(a) - length - 1] == b[len(b) - length - 1]:
+    length += 1
+  return length
+
+# Function to add shift to the line numbers of a node and its children (and of the tokens they keep)
+# The tree is walked with an explicit stack, like in FlatAST.from_node().
+def shift_line_numbers(root, shift):
+  work = [root]
+
+  while work:
+    value = work.pop()
+    if type(value) is list:
+      for index, item in enumerate(value):
+        if type(item) is tuple:
+          value[index] = (item[TOKEN_VALUE], item[TOKEN_TAG], item[TOKEN_LINE_NUMBER] + shift)
+        elif type(item) is list or hasattr(item, '__slots__'):
+          work.append(item)
+      continue
+
+    for name in type(value).__slots__:
+      field = getattr(value, name)
+      if type(field) is tuple:
+        setattr(value, name, (field[TOKEN_VALUE], field[TOKEN_TAG], field[TOKEN_LINE_NUMBER] + shift))
+      elif name == 'line_number':
+        if field is not None:
+          setattr(value, name, field + shift)
+      elif type(field) is list or (hasattr(field, '__slots__') and not isinstance(field, Operator)):
+        work.append(field)
+
+class IncrementalFrontEnd:
+  def __init__(self):
+    self.tokens = None        # Tokens of the last source given to update() (None if it couldn't be lexed)
+
+    # State of the last source that was lexed and parsed without errors
+    self.source = None
+    self.source_tokens = None
+    self.header = None        # Sections before the statements (see Parser.program_header())
+    self.header_end = 0       # Index of the first token after them
+    self.statements = []      # Top-level statements: [first token index, end token index, node, line shift to apply]
+
+  # Function to lex and parse a new version of the source
+  # Returns (program node, None), or (None, error) with the LexError or InvalidSyntaxError of the source.
+  # After an error, the next source is still compared to the last one without errors.
+  def update(self, source):
+    self.tokens = None
+
+    try:
+      if self.source is None:
+        tokens = lolcode_lex(source)
+        self.tokens = tokens
+        self.parse(tokens)
+      elif source != self.source:
+        start = common_prefix_length(self.source, source)
+        suffix = common_suffix_length(self.source, source, min(len(self.source), len(source)) - start)
+        tokens, first, old_resume, new_resume = lolcode_relex(
+          source, self.source_tokens, start, len(self.source) - suffix, len(source) - suffix,
+        )
+        self.tokens = tokens
+        self.reparse(tokens, first, old_resume, new_resume)
+      else:
+        self.tokens = self.source_tokens
+    except LexError as error:
+      return None, error
+    except ParseError as error:
+      return None, error.error
+
+    self.source = source
+    self.source_tokens = self.tokens
+    return self.program(), None
+
+  # Function to parse the whole source
+  def parse(self, tokens):
+    parser = Parser(tokens)
+    header = parser.program_header()
+    header_end = parser.token_index
+    self.statements = self.parse_statements(parser, 0, [])
+    self.header = header
+    self.header_end = header_end
+
+  # Function to parse the statements of the source again, after the tokens from index first changed
+  # (see relex() for the indices)
+  def reparse(self, tokens, first, old_resume, new_resume):
+    # Parse everything again if the edit reaches 'HAI' or the variable section (the parser also
+    # looked at the token after them)
+    if first <= self.header_end:
+      return self.parse(tokens)
+
+    # Restart at the first statement that looked at a changed token (a statement also looks at the
+    # token after it, and checks if there's one more token after that one)
+    old_statements = self.statements
+    restart = 0
+    while restart < len(old_statements) and old_statements[restart][1] + 1 < first:
+      restart += 1
+
+    if restart < len(old_statements):
+      offset = old_statements[restart][0]
+    elif old_statements:
+      offset = old_statements[-1][1]
+    else:
+      offset = self.header_end
+
+    parser = Parser(tokens.iter_from(offset))
+    parser.previous_token = tokens[offset - 1]
+    resync = (restart, old_resume, new_resume, tokens.lines[new_resume] if new_resume < len(tokens) else 0)
+    self.statements = self.parse_statements(parser, offset, old_statements[:restart], resync)
+
+  # Function to parse the top-level statements from where the parser is (offset is the index of its
+  # first token), after the ones in statements
+  # With resync (the index of an old statement and the indices and line of the first reused token),
+  # the old statements from the first one that starts at a reused token on are kept instead.
+  def parse_statements(self, parser, offset, statements, resync=None):
+    if resync:
+      old_index, old_resume, new_resume, new_line = resync
+      old_statements = self.statements
+      old_lines = self.source_tokens.lines
+      token_shift = new_resume - old_resume
+
+    while parser.has_statement():
+      start = offset + parser.token_index
+
+      if resync and start >= new_resume:
+        old_start = start - token_shift
+        while old_index < len(old_statements) and old_statements[old_index][0] < old_start:
+          old_index += 1
+        if old_index < len(old_statements) and old_statements[old_index][0] == old_start:
+          line_shift = new_line - old_lines[old_resume]
+          for old_start, old_end, node, old_line_shift in old_statements[old_index:]:
+            statements.append([old_start + token_shift, old_end + token_shift, node, old_line_shift + line_shift])
+          return statements
+
+      node = parser.statement()
+      statements.append([start, offset + parser.token_index, node, 0])
+
+    parser.end_statement_list()
+    return statements
+
+  def program(self):
+    for statement in self.statements:
+      if statement[3]:
+        shift_line_numbers(statement[2], statement[3])
+        statement[3] = 0
+
+    return ProgramNode(self.header + [StatementListNode([statement[2] for statement in self.statements])])
+
+  def __repr__(self):
+    return f"IncrementalFrontEnd({len(self.statements)} statements)"
@@ -1,19 +1,19 @@
 from lexer.lolcode_lexer import *
 from .errors import *
 from .nodes import *
+from .flat_ast import *
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 # PARSE RESULT
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Result of Parser.parse(): the node of the program, or the error that stopped the parser.
+# The productions themselves return their node directly and raise a ParseError on a syntax error,
+# so only one ParseResult is made per parse.
 class ParseResult:
   def __init__(self):
     self.error = None
     self.node = None
 
-  def register(self, res):
-    if res.error: self.error = res.error
-    return res.node
-
   def success(self, node):
     self.node = node
     return self
@@ -26,23 +26,57 @@ class ParseResult:
 # PARSER
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 class Parser:
-  def __init__(self, tokens):
-    self.tokens = tokens
+  # Tokens can be a list or any iterable (ex. lolcode_lex_stream()), since they're read one at a time
+  # With lazy_functions=True, the bodies of the functions are only parsed when they're first called
+  # (see skip_function_body())
+  def __init__(self, tokens, lazy_functions=False):
+    self.tokens = iter(tokens)
+    self.lazy_functions = lazy_functions
     self.token_index = -1
+    self.previous_token = None
+    self.current_token = None
+    self.next_token = next(self.tokens, None)   # One token lookahead (to know which token is the last)
+    self.is_past_end = False                    # Flag to track if we tried to advance past the last token
     self.advance()
 
   def advance(self):
     self.token_index += 1
-    if (self.token_index < len(self.tokens)):
-      self.current_token = self.tokens[self.token_index]
+    if self.next_token is not None:
+      self.previous_token = self.current_token
+      self.current_token = self.next_token
+      self.next_token = next(self.tokens, None)
+    else:
+      self.is_past_end = True
     return self.current_token
 
-  def parse(self):
+  def is_last_token(self):
+    return self.next_token is None
+
+  # With flat=True, the node of the result is a FlatAST instead of a ProgramNode (see FlatAST.to_node())
+  def parse(self, flat=False):
     res = ParseResult()
+
+    try:
+      program = self.program()
+    except ParseError as error:
+      return res.failure(error.error)
+
+    return res.success(FlatAST.from_node(program) if flat else program)
+
+  def program(self):
+    sections = self.program_header()
+
+    # try to parse statements
+    sections.append(self.statement_list())
+    
+    return ProgramNode(sections)
+
+  # Function to parse 'HAI' and the sections before the statements (see IncrementalFrontEnd)
+  def program_header(self):
     sections = []
 
     if (self.current_token[TOKEN_TAG] != HAI):
-      return res.failure(InvalidSyntaxError(self.current_token, "Expected a 'HAI' Keyword!"))
+      raise ParseError(self.current_token, "Expected a 'HAI' Keyword!")
 
     self.advance() # Eat HAI
 
@@ -50,479 +84,382 @@ class Parser:
     if self.current_token[TOKEN_TAG] == WAZZUP:
       self.advance() # Eat Wazzup
 
-      variable_declaration_section =  res.register(self.variable_section())
-      if variable_declaration_section is None: return res   # Check if there's an error
-      sections.append(variable_declaration_section)         # No error
+      sections.append(self.variable_section())
 
-    # try to parse statements
-    list_of_statements = res.register(self.statement_list())
-    if list_of_statements is None: return res               # Check if there's an error
-    sections.append(list_of_statements)                     # No error
-    
-    return res.success(ProgramNode(sections))
+    return sections
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def variable_section(self):
-    res = ParseResult()
     variable_declarations = []
 
-    while (self.current_token[TOKEN_TAG] != BUHBYE and self.current_token != self.tokens[-1]):
-      variable_declaration = res.register(self.variable_declaration())
-
-      # Has error
-      if variable_declaration is None:
-        return res
-
-      variable_declarations.append(variable_declaration)
+    while (self.current_token[TOKEN_TAG] != BUHBYE and not self.is_last_token()):
+      variable_declarations.append(self.variable_declaration())
 
     # Error
     if (self.current_token[TOKEN_TAG] != BUHBYE):
-      return res.failure(InvalidSyntaxError(self.current_token, "Expected a 'BUHBYE' or keyword!"))
+      raise ParseError(self.current_token, "Expected a 'BUHBYE' or keyword!")
     
     # No error
     self.advance() # Eat BUHBYE
 
-    return res.success(VarDecListNode(variable_declarations))
+    return VarDecListNode(variable_declarations)
 
   def variable_declaration(self):
-    res = ParseResult()
-
     if self.current_token[TOKEN_TAG] == I_HAS_A:
       self.advance() # eats I has a
 
       if (self.current_token[TOKEN_TAG] != IDENTIFIER):
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected Identifier!"))
+        raise ParseError(self.current_token, "Expected Identifier!")
 
       var_name_token = self.current_token
       self.advance() # eats var name
       
       if (self.current_token[TOKEN_TAG] != ITZ):
-        return res.success(VarDeclarationNode(var_name_token, NoobNode()))
+        return VarDeclarationNode(var_name_token, NoobNode())
 
       self.advance() # eats ITZ
 
-      expression = res.register(self.expression())
-      if res.error: return res
+      expression = self.expression()
 
-      return res.success(VarDeclarationNode(var_name_token, expression))
+      return VarDeclarationNode(var_name_token, expression)
 
-    return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'I HAS A' or 'BUHBYE' Keyword!"))
+    raise ParseError(self.current_token, "Expected an 'I HAS A' or 'BUHBYE' Keyword!")
 
   def variable_literal(self):
-    res = ParseResult()
     token = self.current_token
 
     if token[TOKEN_TAG] == IDENTIFIER:
       self.advance() # Eat
 
-      return res.success(VarAccessNode(token))
+      return VarAccessNode(token)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def statement_list(self):
-    res = ParseResult()
     statements = []
 
-    while (self.current_token[TOKEN_TAG] != KTHXBYE and self.current_token !=self.tokens[-1]):
-      statement = res.register(self.statement())
+    while self.has_statement():
+      statements.append(self.statement())
 
-      # Has error
-      if statement is None:
-        return res
+    self.end_statement_list()
 
-      statements.append(statement)
+    return StatementListNode(statements)
 
-    if (self.current_token[TOKEN_TAG] != KTHXBYE):
-      return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'KTHXBYE' keyword!"))
+  # Check if there's another statement before 'KTHXBYE'
+  def has_statement(self):
+    return self.current_token[TOKEN_TAG] != KTHXBYE and not self.is_last_token()
 
-    return res.success(StatementListNode(statements))
+  def end_statement_list(self):
+    if (self.current_token[TOKEN_TAG] != KTHXBYE):
+      raise ParseError(self.current_token, "Expected an 'KTHXBYE' keyword!")
 
+  # The productions return None when they don't apply to the current tokens (and raise a ParseError
+  # when they do, but the tokens have a syntax error)
   def statement(self):
-    res = ParseResult()
-    
-    res.node = res.register(self.assignment_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly
-
-    res.node = res.register(self.expression())
-    if res.error or res.node: return res    # Has an error or parsed correctly
-
-    res.node = res.register(self.print_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.switch_case_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.if_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.loop_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
+    # The current token alone decides which statement can apply (see STATEMENT_PRODUCTIONS)
+    index = self.STATEMENT_TABLE.get(self.current_token[TOKEN_TAG])
+    while index is not None:
+      node = self.STATEMENT_PRODUCTIONS[index][1](self)
+      if node: return node    # Parsed correctly
 
-    res.node = res.register(self.function_definition())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.function_call())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.input_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly 
-
-    res.node = res.register(self.break_statement())
-    if res.error or res.node: return res    # Has an error or parsed correctly   
+      # The statement gave up after eating some tokens (ex. a loop without a valid condition),
+      # so the statements after it in the list get to try the current token
+      index = self.next_statement_production(index)
 
     # Can't parse (skipped other statements)
-    return res.failure(InvalidSyntaxError(self.current_token, 'Unexpected Syntax'))
+    raise ParseError(self.current_token, 'Unexpected Syntax')
+
+  def next_statement_production(self, index):
+    tag = self.current_token[TOKEN_TAG]
+    for next_index in range(index + 1, len(self.STATEMENT_PRODUCTIONS)):
+      if tag in self.STATEMENT_PRODUCTIONS[next_index][0]:
+        return next_index
+    return None
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════  
   def expression(self):
-    res = ParseResult()
+    return self.operand(self.EXPRESSION_OPERANDS)
+
+  # Function to parse an operand (a literal or a whole operation) that starts with the current token.
+  # operands is one of the operand tables (see the end of the class), which tells which tokens can
+  # start the operand. Operations are generators that yield the operand table of every operand they
+  # need, and get the parsed operand back. Instead of recursing, the operations that are waiting for
+  # an operand are kept on a stack, so the nesting of an expression is only limited by memory.
+  # An error in an operand ends the whole expression (the ParseError goes through the operations).
+  # A missing operand is None (ex. the left operand of 'SUM OF AN 1').
+  def operand(self, operands):
+    operations = []   # Operations waiting for an operand (the innermost one last)
+
+    while True:
+      production = operands.get(self.current_token[TOKEN_TAG])
+
+      if production in self.OPERATIONS:
+        # Past the last token, the current token doesn't change anymore, so the operation would
+        # keep asking for operands that start with itself
+        if self.is_past_end:
+          raise ParseError(self.current_token, "Unexpected end of the program!")
+
+        operations.append(production(self))
+        node = None   # Start the operation
 
-    if self.current_token[TOKEN_TAG] in (NUMBR, NUMBAR, YARN, TROOF, IDENTIFIER, NOOB):
-      res.node = res.register(self.literal())
-
-    elif self.current_token[TOKEN_TAG] in (PRODUKT_OF, QUOSHUNT_OF, SUM_OF, DIFF_OF, MOD_OF, BIGGR_OF, SMALLR_OF):
-      res.node =  res.register(self.arithmetic_binary_operation())
-
-    elif self.current_token[TOKEN_TAG] == SMOOSH:
-      res.node = res.register(self.string_concatenation())
-
-    elif self.current_token[TOKEN_TAG] in (BOTH_OF, EITHER_OF, WON_OF, NOT):
-      res.node = res.register(self.boolean_expression())
-    
-    elif self.current_token[TOKEN_TAG] in (ALL_OF, ANY_OF):
-      res.node = res.register(self.boolean_ternary_operation())
+      else:
+        node = production(self) if production is not None else None
 
-    elif self.current_token[TOKEN_TAG] in (BOTH_SAEM, DIFFRINT):
-      res.node = res.register(self.comparison_operation())
+        # Return the operand if there's no operation that waits for it
+        if not operations:
+          return node
 
-    elif self.current_token[TOKEN_TAG] == MAEK_A:
-      res.node = res.register(self.typecast())
+      # Give the operand to the operation that asked for it, and get the table of its next operand
+      # (if the operation is done, it's an operand of the operation before it)
+      while True:
+        try:
+          operands = operations[-1].send(node)
+          break
+        except StopIteration as finished:
+          operations.pop()
+          node = finished.value
 
-    return res
+          if not operations:
+            return node
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def literal(self):
-    res = ParseResult()
-    
-    if self.current_token[TOKEN_TAG] in (NUMBR, NUMBAR):
-      res.node = res.register(self.arithmetic_literal())
-    
-    elif self.current_token[TOKEN_TAG] == YARN:
-      res.node = res.register(self.string_literal())
-    
-    elif self.current_token[TOKEN_TAG] == TROOF:
-      res.node = res.register(self.boolean_literal())
-
-    elif self.current_token[TOKEN_TAG] == IDENTIFIER:
-      res.node = res.register(self.variable_literal())
+    production = self.LITERAL_PRODUCTIONS.get(self.current_token[TOKEN_TAG])
+    if production is None: return None
 
-    elif self.current_token[TOKEN_TAG] == NOOB:
-      res.node = res.register(self.noob())
-
-    return res
+    return production(self)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def noob(self):
-    res = ParseResult()
     token = self.current_token
 
     if token[TOKEN_TAG] == NOOB:
       self.advance() # Eat NOOB
 
-      return res.success(NoobNode(token[TOKEN_LINE_NUMBER]))
+      return NoobNode(token[TOKEN_LINE_NUMBER])
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+  # Operation (see operand())
   def string_concatenation(self):
-    res = ParseResult()
     operands = []
 
-    if self.current_token[TOKEN_TAG] == SMOOSH:
-      self.advance() # Eat SMOOSH
+    self.advance() # Eat SMOOSH
 
-      # Parse the first operand
-      first_operand = res.register(self.expression())
-      if res.error: return res        # Check for error
-      operands.append(first_operand)  # Add to list
+    # Parse the first operand
+    first_operand = yield self.EXPRESSION_OPERANDS
+    operands.append(first_operand)  # Add to list
 
-      while (self.current_token[TOKEN_TAG] == AN):
-        self.advance() # Eat 'AN'
+    while (self.current_token[TOKEN_TAG] == AN):
+      self.advance() # Eat 'AN'
 
-        additional_operand = res.register(self.expression())
-        
-        # Check for errors
-        if additional_operand is None:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected an additional operand!"))
+      additional_operand = yield self.EXPRESSION_OPERANDS
 
-        operands.append(additional_operand) # Add to list
+      # Check for errors
+      if additional_operand is None:
+        raise ParseError(self.current_token, "Expected an additional operand!")
+
+      operands.append(additional_operand) # Add to list
 
-      return res.success(StringConcatNode(operands))
+    return StringConcatNode(operands)
     
   def string_literal(self):
-    res = ParseResult()
     token = self.current_token
 
     if token[TOKEN_TAG] == YARN:
       self.advance() # Eat
 
-      return res.success(StringNode(token))
+      return StringNode(token[TOKEN_VALUE][1:-1], token[TOKEN_LINE_NUMBER])
 
-    return res.failure(InvalidSyntaxError(token, 'Expected a string!'))
+    raise ParseError(token, 'Expected a string!')
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════  
+  # Operation (see operand())
   def arithmetic_binary_operation(self):
-    res = ParseResult()
     
-    # if self.current_token[TOKEN_TAG] in (PRODUKT_OF, QUOSHUNT_OF, SUM_OF, DIFF_OF, BIGGR_OF, SMALLR_OF):
-    operation = self.current_token
+    operator = OPERATORS[self.current_token[TOKEN_TAG]]
     
     self.advance() # Eath
     
     # Parse the left operand
-    left = res.register(self.arithmetic_expression())  # Recursive call to handle the left side
-    if res.error: return res
+    left = yield self.ARITHMETIC_OPERANDS
 
     # check for 'AN' keyword 
     if self.current_token[TOKEN_TAG] != AN:
-        # print(self.current_token[TOKEN_VALUE])
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'AN' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'AN' keyword!")
         
     # Advance past the 'AN' keyword
     self.advance()
 
     # Parse the right operand which may also be an expression
-    right = res.register(self.arithmetic_expression())  # Recursive call to handle right side
-    if res.error: return res
+    right = yield self.ARITHMETIC_OPERANDS
 
     # Return an operation node with left and right operands
-    return res.success(ArithmeticBinaryOpNode(left, operation, right))
-
-  def arithmetic_expression(self):
-    res = ParseResult()
-    token = self.current_token
-
-    if token[TOKEN_TAG] in (NUMBR, NUMBAR, YARN, TROOF, IDENTIFIER):
-      res.node = res.register(self.literal())
-    
-    elif token[TOKEN_TAG] in (PRODUKT_OF, QUOSHUNT_OF, SUM_OF, MOD_OF, DIFF_OF, BIGGR_OF, SMALLR_OF):
-      res.node = res.register(self.arithmetic_binary_operation())
-    
-    return res
+    return ArithmeticBinaryOpNode(left, operator, right)
 
   def arithmetic_literal(self):
-    res = ParseResult()
     token = self.current_token
 
     if token[TOKEN_TAG] in (NUMBR, NUMBAR):
       self.advance()
       
       if token[TOKEN_TAG] == NUMBR:
-        return res.success(IntegerNode(token))
+        return IntegerNode(int(token[TOKEN_VALUE]), token[TOKEN_LINE_NUMBER])
       else:
-        return res.success(FloatNode(token))
+        return FloatNode(float(token[TOKEN_VALUE]), token[TOKEN_LINE_NUMBER])
     
-    return res.failure(InvalidSyntaxError(token, 'Expected int or float!'))
+    raise ParseError(token, 'Expected int or float!')
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
-  def boolean_expression(self):
-    res = ParseResult()
-
-    if self.current_token[TOKEN_TAG] in (BOTH_OF, EITHER_OF, WON_OF):
-      res.node = res.register(self.boolean_binary_operation())
-    
-    elif self.current_token[TOKEN_TAG] == NOT:
-      res.node = res.register(self.boolean_unary_operation())
-    
-    elif self.current_token[TOKEN_TAG] in (NUMBR, NUMBAR, YARN, TROOF, IDENTIFIER):
-      res.node = res.register(self.literal())
-
-    return res
-
+  # Operation (see operand())
   def boolean_ternary_operation(self):
-    res = ParseResult()
     boolean_statements = []
 
-    if self.current_token[TOKEN_TAG] in (ALL_OF, ANY_OF):
-      operation = self.current_token
-      self.advance() # Eat
+    operator = OPERATORS[self.current_token[TOKEN_TAG]]
+    self.advance() # Eat
 
-      # Parse the first operand
-      first_operand = res.register(self.boolean_expression())
-      if res.error: return res # Check for error
-      boolean_statements.append(first_operand) # Add to list
+    # Parse the first operand
+    first_operand = yield self.BOOLEAN_OPERANDS
+    boolean_statements.append(first_operand) # Add to list
 
-      while (self.current_token[TOKEN_TAG] == AN):
-        self.advance() # Eat 'AN'
+    while (self.current_token[TOKEN_TAG] == AN):
+      self.advance() # Eat 'AN'
 
-        additional_operand = res.register(self.boolean_expression())
-        
-        # Check for errors
-        if additional_operand is None:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected an additional operand!"))
+      additional_operand = yield self.BOOLEAN_OPERANDS
+      
+      # Check for errors
+      if additional_operand is None:
+        raise ParseError(self.current_token, "Expected an additional operand!")
 
-        boolean_statements.append(additional_operand) # Add to list
+      boolean_statements.append(additional_operand) # Add to list
 
-      if (self.current_token[TOKEN_TAG] != MKAY):
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'MKAY' keyword!"))
-      
-      # If there's 'MKAY', eat it
-      self.advance()
+    if (self.current_token[TOKEN_TAG] != MKAY):
+      raise ParseError(self.current_token, "Expected an 'MKAY' keyword!")
+    
+    # If there's 'MKAY', eat it
+    self.advance()
 
-      return res.success(BooleanTernaryOpNode(operation, boolean_statements))
+    return BooleanTernaryOpNode(operator, boolean_statements)
 
+  # Operation (see operand())
   def boolean_binary_operation(self):
-    res = ParseResult()
+    operator = OPERATORS[self.current_token[TOKEN_TAG]]
+    self.advance()  # Eat
 
-    if self.current_token[TOKEN_TAG] in (BOTH_OF, EITHER_OF, WON_OF):
-      operation = self.current_token
-      self.advance()  # Eat
-      
-      # print(operation)
-
-      # Parse the left operand
-      left = res.register(self.boolean_expression())
-      if res.error: return res
+    # Parse the left operand
+    left = yield self.BOOLEAN_OPERANDS
 
-      # Check for 'AN' keyword 
-      if self.current_token[TOKEN_TAG] != AN:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'AN' keyword!"))
-          
-      # Advance past the 'AN' keyword
-      self.advance()
+    # Check for 'AN' keyword 
+    if self.current_token[TOKEN_TAG] != AN:
+        raise ParseError(self.current_token, "Expected an 'AN' keyword!")
+        
+    # Advance past the 'AN' keyword
+    self.advance()
 
-      # Parse the right operand
-      right = res.register(self.boolean_expression())
-      if res.error: return res
+    # Parse the right operand
+    right = yield self.BOOLEAN_OPERANDS
 
-      # Return an operation node with left and right operands
-      return res.success(BooleanBinaryOpNode(left, operation, right))
+    # Return an operation node with left and right operands
+    return BooleanBinaryOpNode(left, operator, right)
 
+  # Operation (see operand())
   def boolean_unary_operation(self):
-    res = ParseResult()
-
-    if self.current_token[TOKEN_TAG] == NOT:
-      operation = self.current_token
-      self.advance() # Eat
+    operator = OPERATORS[self.current_token[TOKEN_TAG]]
+    self.advance() # Eat
 
-      # Parse the operand
-      operand = res.register(self.boolean_expression())
-      if res.error: return res
+    # Parse the operand
+    operand = yield self.BOOLEAN_OPERANDS
 
-      return res.success(BooleanUnaryOpNode(operation, operand))
+    return BooleanUnaryOpNode(operator, operand)
 
   def boolean_literal(self):
-    res = ParseResult()
     token = self.current_token
 
-    if token[TOKEN_TAG] in (TROOF):
+    if token[TOKEN_TAG] == TROOF:
       self.advance() # Eat
       
-      return res.success(BooleanNode(token))
+      return BooleanNode(token[TOKEN_VALUE] == 'WIN', token[TOKEN_LINE_NUMBER])
     
     # Error    
-    return res.failure(InvalidSyntaxError(token, 'Expected boolean!'))
+    raise ParseError(token, 'Expected boolean!')
   
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+  # Operation (see operand())
   def comparison_operation(self):
-    res = ParseResult()
-    token = self.current_token
-
-    if token[TOKEN_TAG] in (BOTH_SAEM, DIFFRINT):
-      operation = self.current_token
-      self.advance() # Eat
+    operator = OPERATORS[self.current_token[TOKEN_TAG]]
+    self.advance() # Eat
 
-      # Parse the left operand
-      left = res.register(self.expression())
-      if res.error: return res
-
-      # Check for 'AN' keyword 
-      if self.current_token[TOKEN_TAG] != AN:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'AN' keyword!"))
-    
-      # Advance past the 'AN' keyword
-      self.advance()
+    # Parse the left operand
+    left = yield self.EXPRESSION_OPERANDS
 
-      # Parse the right operand
-      # Check if there is BIGGR OF or SMALLR OF keywords
-      if self.current_token[TOKEN_TAG] in (BIGGR_OF, SMALLR_OF):
-        right = res.register(self.arithmetic_binary_operation())
+    # Check for 'AN' keyword 
+    if self.current_token[TOKEN_TAG] != AN:
+        raise ParseError(self.current_token, "Expected an 'AN' keyword!")
+  
+    # Advance past the 'AN' keyword
+    self.advance()
 
-        # There's an error
-        if right is None:
-          return res
-      
-      else:
-        right = res.register(self.expression())
-        if res.error: return res
+    # Parse the right operand
+    # (BIGGR OF or SMALLR OF for >= and <= comparisons are arithmetic operations)
+    right = yield self.EXPRESSION_OPERANDS
 
-      # Return an operation node with left and right operands
-      return res.success(ComparisonOpNode(left, operation, right))
+    # Return an operation node with left and right operands
+    return ComparisonOpNode(left, operator, right)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def print_statement(self):
-    res = ParseResult()
     operands = []
 
     if self.current_token[TOKEN_TAG] == VISIBLE:
       self.advance() # Eat VISIBLE
 
       # Parse the first operand
-      first_operand = res.register(self.expression())
-      if res.error: return res        # Check for error
+      first_operand = self.expression()
       operands.append(first_operand)  # Add to list
 
       while (self.current_token[TOKEN_TAG] in (VISIBLE_OPERATOR, AN)):
         self.advance() # Eat '+'
 
-        additional_operand = res.register(self.expression())
+        additional_operand = self.expression()
         
         # Check for errors
         if additional_operand is None:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected an additional operand!"))
+          raise ParseError(self.current_token, "Expected an additional operand!")
 
         operands.append(additional_operand) # Add to list
 
       # Raise an error if a delimiter symbol between operands is missing
       # Make sure that the current token isn't the last element in the input (to prevent incorrect error messages)
-      if self.token_index < len(self.tokens):   
-        previous_token_index = self.token_index - 1
-        previous_token = self.tokens[previous_token_index]
-        
+      if not self.is_past_end:
+        previous_token = self.previous_token
+
         if self.current_token[TOKEN_LINE_NUMBER] == previous_token[TOKEN_LINE_NUMBER]:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected a delimiter symbol ('+' or 'AN') for the VISIBLE statement."))
+          raise ParseError(self.current_token, "Expected a delimiter symbol ('+' or 'AN') for the VISIBLE statement.")
 
       # Success
-      return res.success(PrintNode(operands))
-  
-    return res
+      return PrintNode(operands)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+  # Operation (see operand())
   def typecast(self):
-    res = ParseResult()
+    self.advance() # Eat MAEK A
 
-    if self.current_token[TOKEN_TAG] == MAEK_A:
-      self.advance() # Eat MAEK A
-
-      # Parse the value to typecast
-      source_value = res.register(self.expression()) # Don't know if var only so Ii set it to expression instead
-        
-      # Check for errors
-      if source_value is None:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a value to typecast!"))
-
-      if self.current_token[TOKEN_VALUE] in ("NUMBAR", "NUMBR", "YARN", "TROOF"):
-        desired_type = self.current_token[TOKEN_VALUE]
+    # Parse the value to typecast
+    source_value = yield self.EXPRESSION_OPERANDS # Don't know if var only so Ii set it to expression instead
+      
+    # Check for errors
+    if source_value is None:
+      raise ParseError(self.current_token, "Expected a value to typecast!")
 
-        self.advance() # Eat desired type
+    if self.current_token[TOKEN_VALUE] in ("NUMBAR", "NUMBR", "YARN", "TROOF"):
+      desired_type = self.current_token[TOKEN_VALUE]
 
-        return res.success(TypecastNode(source_value, desired_type))
-      else:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a type to cast the value!"))
+      self.advance() # Eat desired type
 
-    return res
+      return TypecastNode(source_value, desired_type)
+    else:
+      raise ParseError(self.current_token, "Expected a type to cast the value!")
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def assignment_statement(self):
-    res = ParseResult()
-
     if self.current_token[TOKEN_TAG] == IDENTIFIER:
       var_to_access = self.current_token
 
@@ -531,73 +468,61 @@ class Parser:
       # Check for 'R' keyword 
       if self.current_token[TOKEN_TAG] not in (R, IS_NOW_A):
         # If there's no R or IS NOW A, then it might just be a variable access
-        return res.success(VarAccessNode(var_to_access))
+        return VarAccessNode(var_to_access)
 
 
       # Else, continue
       if self.current_token[TOKEN_TAG] == R:
         self.advance() # Eat R
 
-        value_to_assign = res.register(self.expression())
+        value_to_assign = self.expression()
 
         # Check for errors
         if value_to_assign is None:
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected a value to assign!"))
+          raise ParseError(self.current_token, "Expected a value to assign!")
 
-        return res.success(VarAssignmentNode(var_to_access, value_to_assign))
+        return VarAssignmentNode(var_to_access, value_to_assign)
       
       # Var assignment with TYPECASTING
       elif self.current_token[TOKEN_TAG] == IS_NOW_A:
         self.advance() # Eat IS NOW A
 
         if self.current_token[TOKEN_VALUE] not in ("NUMBAR", "NUMBR", "YARN", "TROOF"):
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected a type to cast the value!"))
+          raise ParseError(self.current_token, "Expected a type to cast the value!")
 
         # Else, continue
         desired_type = self.current_token[TOKEN_VALUE]
 
         self.advance() # Eat the desired type
 
-        return res.success(VarAssignmentNode(var_to_access, TypecastNode(VarAccessNode(var_to_access), desired_type)))
-
-    return res
+        return VarAssignmentNode(var_to_access, TypecastNode(VarAccessNode(var_to_access), desired_type))
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def input_statement(self):
-    res = ParseResult()
-
     if self.current_token[TOKEN_TAG] == GIMMEH:
       self.advance() # Eat Gimmeh
 
       # Error
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a variable to store input!"))
+        raise ParseError(self.current_token, "Expected a variable to store input!")
 
       # Check if the variable name is valid      
-      variable_to_access = res.register(self.variable_literal())
-      if variable_to_access is None: return res # Error
+      variable_to_access = self.variable_literal()
 
       # Proceed to the next step (getting user input and storing it in the variable stated)
-      return res.success(InputNode(variable_to_access))
-
-    return res
+      return InputNode(variable_to_access)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   # TODO: GTFO
   def break_statement(self):
-    res = ParseResult()
-
     if self.current_token[TOKEN_TAG] == GTFO:
       break_token = self.current_token
       self.advance() # Eat GTFO
       
-      return res.success(BreakNode(break_token))
-
-    return res
+      return BreakNode(break_token)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def if_statement(self):
-    res = ParseResult()
     if_block_statements = []
     else_block_statements = []
     if self.current_token[TOKEN_TAG] == O_RLY:
@@ -605,56 +530,42 @@ class Parser:
 
       # Error
       if self.current_token[TOKEN_TAG] != YA_RLY:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'YA RLY' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'YA RLY' keyword!")
 
       self.advance() # Eat YA RLY
 
       while self.current_token[TOKEN_TAG] not in (NO_WAI, OIC, KTHXBYE):
-        statement = res.register(self.statement())
-
-        # Has error
-        if statement is None:
-          return res
-
-        if_block_statements.append(statement)
+        if_block_statements.append(self.statement())
 
       # No Else
       if self.current_token[TOKEN_TAG] != NO_WAI:
         # Check for OIC
         if self.current_token[TOKEN_TAG] == OIC:
           self.advance() # Eat OIC
-          return res.success(IfNode(if_block_statements, else_block_statements))
+          return IfNode(if_block_statements, else_block_statements)
         
         # Error
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a 'NO WAI' keyword!"))
+        raise ParseError(self.current_token, "Expected a 'NO WAI' keyword!")
       
       # Eat NO WAI
       self.advance() 
 
       while self.current_token[TOKEN_TAG] not in (OIC, KTHXBYE):
-        statement = res.register(self.statement())
-
-        # Has error
-        if statement is None:
-          return res
-
-        else_block_statements.append(statement)
+        else_block_statements.append(self.statement())
       
       # Error
       if self.current_token[TOKEN_TAG] != OIC:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a 'NO WAI' keyword!"))
+        raise ParseError(self.current_token, "Expected a 'NO WAI' keyword!")
       
       # Eat OIC
       self.advance()
       
-      return res.success(IfNode(if_block_statements, else_block_statements))
-    return res
+      return IfNode(if_block_statements, else_block_statements)
 
 
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def switch_case_statement(self):
-    res = ParseResult()
     cases = []
     cases_statements = []
     default_case_statements = []
@@ -665,7 +576,7 @@ class Parser:
       
       # Error
       if self.current_token[TOKEN_TAG] != OMG:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'OMG' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'OMG' keyword!")
 
       while self.current_token[TOKEN_TAG] == OMG:
         statements = []
@@ -675,23 +586,14 @@ class Parser:
 
         # Error
         if self.current_token[TOKEN_TAG] not in (NUMBR, NUMBAR, YARN, TROOF, IDENTIFIER, NOOB):
-          return res.failure(InvalidSyntaxError(self.current_token, "Expected a literal for switch case!"))
+          raise ParseError(self.current_token, "Expected a literal for switch case!")
 
         # Eat 
-        case_condition = res.register(self.literal())
-
-        # Has error
-        if case_condition is None:
-          return res
+        case_condition = self.literal()
+        if case_condition is None: return None
 
         while self.current_token[TOKEN_TAG] not in (OMG, OMGWTF, OIC, KTHXBYE):
-          statement = res.register(self.statement())
-
-          # Has error
-          if statement is None:
-            return res
-
-          statements.append(statement)
+          statements.append(self.statement())
         # Loop end
       
         cases.append(case_condition)
@@ -699,36 +601,27 @@ class Parser:
       # Loop end
 
       if self.current_token[TOKEN_TAG] != OMGWTF:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a default case for switch case!"))
+        raise ParseError(self.current_token, "Expected a default case for switch case!")
 
       # Eat OMGWTF
       self.advance()
 
       # Add switch case
       while self.current_token[TOKEN_TAG] not in (OIC, KTHXBYE):
-        statement = res.register(self.statement())
-
-        # Has error
-        if statement is None:
-          return res
-
-        default_case_statements.append(statement)
+        default_case_statements.append(self.statement())
 
       if self.current_token[TOKEN_TAG] != OIC:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'OIC' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'OIC' keyword!")
 
       # Eat OIC
       self.advance()
 
-      return res.success(SwitchCaseNode(cases, cases_statements, default_case_statements))
-
-    return res
+      return SwitchCaseNode(cases, cases_statements, default_case_statements)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def loop_statement(self):
-    res = ParseResult()
     label = None
-    operation = None
+    operator = None
     variable = None
     til_wile_expression = None
     body_statements = []
@@ -738,23 +631,23 @@ class Parser:
       self.advance()
 
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a label for the loop!"))
+        raise ParseError(self.current_token, "Expected a label for the loop!")
       
       label = self.current_token[TOKEN_VALUE]
       # Eat label
       self.advance()
 
       if self.current_token[TOKEN_TAG] not in (UPPIN, NERFIN):
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an operation for the loop condition!"))
+        raise ParseError(self.current_token, "Expected an operation for the loop condition!")
       
       # Else, no error
-      operation = self.current_token
+      operator = OPERATORS[self.current_token[TOKEN_TAG]]
 
       # Eat UPPIN or NERFIN
       self.advance()
 
       if self.current_token[TOKEN_TAG] != YR:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a 'YR' keyword for the loop!"))
+        raise ParseError(self.current_token, "Expected a 'YR' keyword for the loop!")
       
       # Else, no error
       # Eat YR
@@ -762,7 +655,7 @@ class Parser:
 
       # Var
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a variable for the loop!"))
+        raise ParseError(self.current_token, "Expected a variable for the loop!")
 
       # Get the desired variable to access (same with assignment statement)
       variable = self.current_token
@@ -777,31 +670,25 @@ class Parser:
         clause_type = self.current_token[TOKEN_TAG]
         self.advance()
 
-        til_wile_expression = res.register(self.expression())
+        til_wile_expression = self.expression()
 
-        # Has error
+        # No expression (the loop doesn't apply, see statement())
         if til_wile_expression is None:
-          return res
+          return None
         
       # Loop body
       while self.current_token[TOKEN_TAG] not in (IM_OUTTA_YR, KTHXBYE):
-        statement = res.register(self.statement())
-
-        # Has error
-        if statement is None:
-          return res
-
-        body_statements.append(statement)
+        body_statements.append(self.statement())
       
       # Loop out
       if self.current_token[TOKEN_TAG] != IM_OUTTA_YR:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'IM OUTTA YR' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'IM OUTTA YR' keyword!")
 
       # Eat IM OUTTA YR
       self.advance()
 
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a label to exit the loop!"))
+        raise ParseError(self.current_token, "Expected a label to exit the loop!")
 
       out_label = self.current_token[TOKEN_VALUE]
 
@@ -810,19 +697,15 @@ class Parser:
 
       # print(label, out_label)
       if label != out_label:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a similar label to exit the loop!"))
+        raise ParseError(self.current_token, "Expected a similar label to exit the loop!")
       
       
-      return res.success(LoopNode(label, operation, variable, clause_type, til_wile_expression, body_statements))
-    
-    return res
+      return LoopNode(label, operator, variable, clause_type, til_wile_expression, body_statements)
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def function_definition(self):
-    res = ParseResult()
     function_name = None
     parameters = []
-    body_statements = []
 
     if self.current_token[TOKEN_TAG] == HOW_IZ_I:
       # Eat HOW IZ I
@@ -830,7 +713,7 @@ class Parser:
 
       # Identifier
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a valid function name!"))
+        raise ParseError(self.current_token, "Expected a valid function name!")
       
       function_name = self.current_token
       # Eat function name
@@ -841,8 +724,8 @@ class Parser:
         # Eat YR
         self.advance()
 
-        first_param = res.register(self.expression())
-        if first_param is None: return res # Has error
+        first_param = self.expression()
+        if first_param is None: return None
 
         parameters.append(first_param)
 
@@ -851,40 +734,80 @@ class Parser:
           # Eat AN YR
           self.advance()
 
-          additional_param = res.register(self.expression())
-          if additional_param is None: return res # Has error
+          additional_param = self.expression()
+          if additional_param is None: return None
 
           parameters.append(additional_param)
 
       # function body
-      while self.current_token[TOKEN_TAG] not in (FOUND_YR, IF_U_SAY_SO, KTHXBYE):
-        statement = res.register(self.statement())
-        if statement is None: return res # Has error
+      if self.lazy_functions:
+        return FuncDefNode(function_name, parameters, None, self.skip_function_body())
 
-        body_statements.append(statement)
+      body_statements = self.function_body()
+      if body_statements is None: return None
 
-      if self.current_token[TOKEN_TAG] == FOUND_YR:
-        # Eat FOUND YR
-        self.advance()
+      return FuncDefNode(function_name, parameters, body_statements)
 
-        return_expression  = res.register(self.expression())
-        if return_expression is None: return res # Has error
+  def function_body(self):
+    body_statements = []
 
-        body_statements.append(return_expression)
+    while self.current_token[TOKEN_TAG] not in (FOUND_YR, IF_U_SAY_SO, KTHXBYE):
+      body_statements.append(self.statement())
 
-      if self.current_token[TOKEN_TAG] != IF_U_SAY_SO:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'IF U SAY SO' keyword!"))
-      
-      # Eat IF U SAY SO
+    if self.current_token[TOKEN_TAG] == FOUND_YR:
+      # Eat FOUND YR
       self.advance()
 
-      return res.success(FuncDefNode(function_name, parameters, body_statements))
+      return_expression = self.expression()
+      if return_expression is None: return None
+
+      body_statements.append(return_expression)
+
+    if self.current_token[TOKEN_TAG] != IF_U_SAY_SO:
+      raise ParseError(self.current_token, "Expected an 'IF U SAY SO' keyword!")
+    
+    # Eat IF U SAY SO
+    self.advance()
+
+    return body_statements
+
+  # Function to skip the body of a function in lazy mode
+  # Returns the tokens of the body up to its 'IF U SAY SO' (the ones of the functions defined in it
+  # included), which are parsed by parse_function_body() on the first call of the function.
+  # Syntax errors in the body are only found then.
+  def skip_function_body(self):
+    body_tokens = []
+    depth = 0   # Functions defined in the body
+
+    while True:
+      token = self.current_token
+      if token[TOKEN_TAG] == KTHXBYE or self.is_past_end:
+        raise ParseError(token, "Expected an 'IF U SAY SO' keyword!")
 
-    return res
+      body_tokens.append(token)
+      if token[TOKEN_TAG] == IF_U_SAY_SO:
+        if depth == 0: break
+        depth -= 1
+      elif token[TOKEN_TAG] == HOW_IZ_I:
+        depth += 1
+
+      self.advance()
+
+    # Eat IF U SAY SO
+    self.advance()
+
+    return body_tokens
+
+  # Function to parse the tokens of a skipped function body (see skip_function_body())
+  def parse_function_body(self):
+    body_statements = self.function_body()
+    if body_statements is None:
+      raise ParseError(self.current_token, 'Unexpected Syntax')
+
+    return body_statements
 
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
   def function_call(self):
-    res = ParseResult()
     function_name = None
     parameters = []
 
@@ -894,18 +817,18 @@ class Parser:
 
       # Identifier
       if self.current_token[TOKEN_TAG] != IDENTIFIER:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected a valid function name!"))
+        raise ParseError(self.current_token, "Expected a valid function name!")
       
-      function_name = res.register(self.expression())
-      if function_name is None: return res
+      function_name = self.expression()
+      if function_name is None: return None
 
       # Check if there are parameters
       if self.current_token[TOKEN_TAG] == YR:
         # Eat YR
         self.advance()
 
-        first_param = res.register(self.expression())
-        if first_param is None: return res # Has error
+        first_param = self.expression()
+        if first_param is None: return None
 
         parameters.append(first_param)
 
@@ -914,18 +837,82 @@ class Parser:
           # Eat AN YR
           self.advance()
 
-          additional_param = res.register(self.expression())
-          if additional_param is None: return res # Has error
+          additional_param = self.expression()
+          if additional_param is None: return None
 
           parameters.append(additional_param)
 
       # function body
       if self.current_token[TOKEN_TAG] != MKAY:
-        return res.failure(InvalidSyntaxError(self.current_token, "Expected an 'MKAY' keyword!"))
+        raise ParseError(self.current_token, "Expected an 'MKAY' keyword!")
       
       # Eat MKAY
       self.advance()
 
-      return res.success(FuncCallNode(function_name, parameters))
+      return FuncCallNode(function_name, parameters)
 
-    return res
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# PRODUCTION TABLES
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+  # The tag of the first token decides which production applies, so statement(), operand() and
+  # literal() look it up instead of trying every production in turn.
+  LITERAL_PRODUCTIONS = {
+    NUMBR: arithmetic_literal,
+    NUMBAR: arithmetic_literal,
+    YARN: string_literal,
+    TROOF: boolean_literal,
+    IDENTIFIER: variable_literal,
+    NOOB: noob,
+  }
+
+  # Operations (the productions that are parsed by operand())
+  OPERATIONS = {
+    arithmetic_binary_operation, string_concatenation, boolean_binary_operation, boolean_unary_operation,
+    boolean_ternary_operation, comparison_operation, typecast,
+  }
+
+  # Operand tables: the tokens that can start each kind of operand, and their productions
+  EXPRESSION_OPERANDS = {
+    **LITERAL_PRODUCTIONS,
+    **dict.fromkeys((PRODUKT_OF, QUOSHUNT_OF, SUM_OF, DIFF_OF, MOD_OF, BIGGR_OF, SMALLR_OF), arithmetic_binary_operation),
+    SMOOSH: string_concatenation,
+    **dict.fromkeys((BOTH_OF, EITHER_OF, WON_OF), boolean_binary_operation),
+    NOT: boolean_unary_operation,
+    **dict.fromkeys((ALL_OF, ANY_OF), boolean_ternary_operation),
+    **dict.fromkeys((BOTH_SAEM, DIFFRINT), comparison_operation),
+    MAEK_A: typecast,
+  }
+
+  # Literals that can be operands of arithmetic and boolean operations (every literal but NOOB)
+  OPERAND_LITERALS = {tag: production for tag, production in LITERAL_PRODUCTIONS.items() if tag != NOOB}
+
+  # Operands of arithmetic operations
+  ARITHMETIC_OPERANDS = {
+    **OPERAND_LITERALS,
+    **dict.fromkeys((PRODUKT_OF, QUOSHUNT_OF, SUM_OF, MOD_OF, DIFF_OF, BIGGR_OF, SMALLR_OF), arithmetic_binary_operation),
+  }
+
+  # Operands of boolean operations
+  BOOLEAN_OPERANDS = {
+    **dict.fromkeys((BOTH_OF, EITHER_OF, WON_OF), boolean_binary_operation),
+    NOT: boolean_unary_operation,
+    **OPERAND_LITERALS,
+  }
+
+  # Statements in the order they're tried, with the tags they can start with
+  # (an identifier is an assignment or a plain variable access, so it's taken before expressions)
+  STATEMENT_PRODUCTIONS = (
+    ((IDENTIFIER,), assignment_statement),
+    (tuple(EXPRESSION_OPERANDS), expression),
+    ((VISIBLE,), print_statement),
+    ((WTF,), switch_case_statement),
+    ((O_RLY,), if_statement),
+    ((IM_IN_YR,), loop_statement),
+    ((HOW_IZ_I,), function_definition),
+    ((I_IZ,), function_call),
+    ((GIMMEH,), input_statement),
+    ((GTFO,), break_statement),
+  )
+
+  # Tag to the index of the first statement that can start with it
+  STATEMENT_TABLE = {tag: index for index, (tags, production) in reversed(list(enumerate(STATEMENT_PRODUCTIONS))) for tag in tags}
@@ -1,37 +1,104 @@
+from enum import IntEnum
 from lexer.lolcode_lexer import *
 
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# OPERATORS
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Operation tags are decoded once by the parser, so the nodes only keep a small enum (instead of
+# the whole token) and the interpreter can dispatch on it directly.
+class Operator(IntEnum):
+  SUM_OF = 1
+  DIFF_OF = 2
+  PRODUKT_OF = 3
+  QUOSHUNT_OF = 4
+  MOD_OF = 5
+  BIGGR_OF = 6
+  SMALLR_OF = 7
+  BOTH_OF = 8
+  EITHER_OF = 9
+  WON_OF = 10
+  NOT = 11
+  ALL_OF = 12
+  ANY_OF = 13
+  BOTH_SAEM = 14
+  DIFFRINT = 15
+  UPPIN = 16
+  NERFIN = 17
+
+  # The operator as written in the source code (ex. 'SUM OF')
+  @property
+  def keyword(self):
+    return self.name.replace('_', ' ')
+
+# Operators by token tag
+OPERATORS = {
+  SUM_OF: Operator.SUM_OF,
+  DIFF_OF: Operator.DIFF_OF,
+  PRODUKT_OF: Operator.PRODUKT_OF,
+  QUOSHUNT_OF: Operator.QUOSHUNT_OF,
+  MOD_OF: Operator.MOD_OF,
+  BIGGR_OF: Operator.BIGGR_OF,
+  SMALLR_OF: Operator.SMALLR_OF,
+  BOTH_OF: Operator.BOTH_OF,
+  EITHER_OF: Operator.EITHER_OF,
+  WON_OF: Operator.WON_OF,
+  NOT: Operator.NOT,
+  ALL_OF: Operator.ALL_OF,
+  ANY_OF: Operator.ANY_OF,
+  BOTH_SAEM: Operator.BOTH_SAEM,
+  DIFFRINT: Operator.DIFFRINT,
+  UPPIN: Operator.UPPIN,
+  NERFIN: Operator.NERFIN,
+}
+
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
 # NODES
 # ═════════════════════════════════════════════════════════════════════════════════════════════════
+# Every node has __slots__ (no per-instance __dict__), since a program can have a lot of them.
+# Literals keep their value already converted to its runtime type (int, float, bool or str).
 class IntegerNode:
-  def __init__(self, token):
-    self.token = token
+  __slots__ = ('value', 'line_number')
+
+  def __init__(self, value, line_number=None):
+    self.value = value
+    self.line_number = line_number
 
   def __repr__(self):
-    return f'{self.token[TOKEN_VALUE]}'
+    return f'{self.value}'
 
 class FloatNode:
-  def __init__(self, token):
-    self.token = token
+  __slots__ = ('value', 'line_number')
+
+  def __init__(self, value, line_number=None):
+    self.value = value
+    self.line_number = line_number
 
   def __repr__(self):
-    return f'{self.token[TOKEN_VALUE]}'
+    return f'{self.value}'
   
 class BooleanNode:
-  def __init__(self, token):
-    self.token = token
+  __slots__ = ('value', 'line_number')
+
+  def __init__(self, value, line_number=None):
+    self.value = value
+    self.line_number = line_number
 
   def __repr__(self):
-    return f'{self.token[TOKEN_VALUE]}'
+    return 'WIN' if self.value else 'FAIL'
   
 class StringNode:
-  def __init__(self, token):
-    self.token = (str(token[TOKEN_VALUE][1:-1]), token[TOKEN_TAG], token[TOKEN_LINE_NUMBER])
+  __slots__ = ('value', 'line_number')
+
+  def __init__(self, value, line_number=None):
+    self.value = value
+    self.line_number = line_number
 
   def __repr__(self):
-    return f'"{self.token[TOKEN_VALUE]}"'
+    return f'"{self.value}"'
 
 class NoobNode:
+  __slots__ = ('line_number',)
+
   def __init__(self, line_number=None):
     self.line_number = line_number
 
@@ -39,6 +106,8 @@ class NoobNode:
     return f"NOOB"
 
 class StringConcatNode:
+  __slots__ = ('operands',)
+
   def __init__(self, operands):
     self.operands = operands
 
@@ -46,49 +115,61 @@ class StringConcatNode:
     return f"StringConcatenation({self.operands})"
   
 class ArithmeticBinaryOpNode:
-  def __init__(self, left_node, operation, right_node):
-    self.operation = operation
+  __slots__ = ('operator', 'left_node', 'right_node')
+
+  def __init__(self, left_node, operator, right_node):
+    self.operator = operator
     self.left_node = left_node
     self.right_node = right_node
 
   def __repr__(self):
-    return f'{self.operation[TOKEN_VALUE]}({self.left_node}, {self.right_node})'
+    return f'{self.operator.keyword}({self.left_node}, {self.right_node})'
 
 class BooleanBinaryOpNode:
-  def __init__(self, left_node, operation, right_node):
-    self.operation = operation
+  __slots__ = ('operator', 'left_node', 'right_node')
+
+  def __init__(self, left_node, operator, right_node):
+    self.operator = operator
     self.left_node = left_node
     self.right_node = right_node
 
   def __repr__(self):
-    return f'{self.operation[TOKEN_VALUE]}({self.left_node}, {self.right_node})' 
+    return f'{self.operator.keyword}({self.left_node}, {self.right_node})' 
 
 class BooleanUnaryOpNode:
-  def __init__(self, operation, operand):
-    self.operation = operation
+  __slots__ = ('operator', 'operand')
+
+  def __init__(self, operator, operand):
+    self.operator = operator
     self.operand = operand
 
   def __repr__(self):
-    return f'{self.operation[TOKEN_VALUE]}({self.operand})'
+    return f'{self.operator.keyword}({self.operand})'
   
 class BooleanTernaryOpNode:
-  def __init__(self, operation, boolean_statements):
-    self.operation = operation
+  __slots__ = ('operator', 'boolean_statements')
+
+  def __init__(self, operator, boolean_statements):
+    self.operator = operator
     self.boolean_statements = boolean_statements
 
   def __repr__(self):
-    return f"{self.operation}({self.boolean_statements})"
+    return f"{self.operator.keyword}({self.boolean_statements})"
 
 class ComparisonOpNode:
-  def __init__(self, left_node, operation, right_node):
-    self.operation = operation
+  __slots__ = ('operator', 'left_node', 'right_node')
+
+  def __init__(self, left_node, operator, right_node):
+    self.operator = operator
     self.left_node = left_node
     self.right_node = right_node
 
   def __repr__(self):
-    return f'{self.operation[TOKEN_VALUE]}({self.left_node}, {self.right_node})' 
+    return f'{self.operator.keyword}({self.left_node}, {self.right_node})' 
 
 class VarAccessNode:
+  __slots__ = ('var_name_token',)
+
   def __init__(self, var_name_token):
     self.var_name_token = var_name_token
 
@@ -96,6 +177,8 @@ class VarAccessNode:
     return f"VarAccess({self.var_name_token[TOKEN_VALUE]})"
 
 class VarDeclarationNode:
+  __slots__ = ('var_name_token', 'value_node')
+
   def __init__(self, var_name_token, value_node):
     self.var_name_token = var_name_token
     self.value_node = value_node
@@ -104,6 +187,8 @@ class VarDeclarationNode:
     return f"VarDeclare({self.var_name_token[TOKEN_VALUE]}, {self.value_node})"
 
 class VarAssignmentNode:
+  __slots__ = ('var_to_access', 'value_to_assign')
+
   def __init__(self, var_to_access, value_to_assign):
     self.var_to_access = var_to_access
     self.value_to_assign = value_to_assign
@@ -112,6 +197,8 @@ class VarAssignmentNode:
     return f"VarAssign({self.var_to_access[TOKEN_VALUE]}, {self.value_to_assign})"
 
 class StatementListNode:
+  __slots__ = ('statements',)
+
   def __init__(self, statements):
     self.statements = statements
 
@@ -119,6 +206,8 @@ class StatementListNode:
     return f"StatementList({self.statements})"
 
 class VarDecListNode:
+  __slots__ = ('variable_declarations',)
+
   def __init__(self, variable_declarations):
     self.variable_declarations = variable_declarations
 
@@ -126,6 +215,8 @@ class VarDecListNode:
     return f"VarDecListNode({self.variable_declarations})"
 
 class PrintNode:
+  __slots__ = ('operands',)
+
   def __init__(self, operands):
     self.operands = operands
   
@@ -133,6 +224,8 @@ class PrintNode:
     return f"PrintNode({self.operands})"
 
 class TypecastNode:
+  __slots__ = ('source_value', 'desired_type')
+
   def __init__(self, source_value, desired_type):
     self.source_value = source_value
     self.desired_type = desired_type
@@ -141,6 +234,8 @@ class TypecastNode:
     return f"{self.desired_type}({self.source_value})"
 
 class SwitchCaseNode:
+  __slots__ = ('cases', 'cases_statements', 'default_case_statements')
+
   def __init__(self, cases, cases_statements, default_case_statements):
     self.cases = cases
     self.cases_statements = cases_statements
@@ -150,6 +245,8 @@ class SwitchCaseNode:
     return f"SwitchCases({self.cases_statements})"
 
 class IfNode:
+  __slots__ = ('if_block_statements', 'else_block_statements')
+
   def __init__(self, if_block_statements, else_block_statements):
     self.if_block_statements = if_block_statements
     self.else_block_statements = else_block_statements
@@ -158,27 +255,36 @@ class IfNode:
     return f"IfElse({self.if_block_statements}, {self.else_block_statements})"
 
 class LoopNode:
-  def __init__(self, label, operation, variable, clause_type, til_wile_expression, body_statements):
+  __slots__ = ('label', 'operator', 'variable', 'clause_type', 'til_wile_expression', 'body_statements')
+
+  def __init__(self, label, operator, variable, clause_type, til_wile_expression, body_statements):
     self.label = label
-    self.operation = operation
+    self.operator = operator
     self.variable = variable
     self.clause_type = clause_type
     self.til_wile_expression = til_wile_expression
     self.body_statements = body_statements
 
   def __repr__(self):
-    return f"Loop({self.label}, {self.operation[TOKEN_VALUE]}, {self.variable}, {self.clause_type}, {self.til_wile_expression}, {self.body_statements})"
+    return f"Loop({self.label}, {self.operator.keyword}, {self.variable}, {self.clause_type}, {self.til_wile_expression}, {self.body_statements})"
 
+# The body_statements of a function are None until they're parsed if the parser only kept its
+# body_tokens (see Parser.skip_function_body())
 class FuncDefNode:
-  def __init__(self, function_name, parameters, body_statements):
+  __slots__ = ('function_name', 'parameters', 'body_statements', 'body_tokens')
+
+  def __init__(self, function_name, parameters, body_statements, body_tokens=None):
     self.function_name = function_name
     self.parameters = parameters
     self.body_statements = body_statements
+    self.body_tokens = body_tokens
 
   def __repr__(self):
     return f"FuncDef({self.function_name}, {self.parameters})"
 
 class FuncCallNode:
+  __slots__ = ('function_name', 'parameters')
+
   def __init__(self, function_name, parameters):
     self.function_name = function_name
     self.parameters = parameters
@@ -187,6 +293,8 @@ class FuncCallNode:
     return f"FuncCall({self.function_name}, {self.parameters})"
 
 class InputNode:
+  __slots__ = ('variable',)
+
   def __init__(self, variable):
     self.variable = variable
 
@@ -194,6 +302,8 @@ class InputNode:
     return f"StoreTo({self.variable})"
 
 class BreakNode:
+  __slots__ = ('break_token',)
+
   def __init__(self, break_token):
     self.break_token = break_token
 
@@ -201,6 +311,8 @@ class BreakNode:
     return f"BREAK"
 
 class ProgramNode:
+  __slots__ = ('sections',)
+
   def __init__(self, sections):
     self.sections = sections
 
@@ -0,0 +1,152 @@
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import tempfile
+from lexer.lolcode_lexer import *
+from .flat_ast import *
+
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# PARSE CACHE
+# ═════════════════════════════════════════════════════════════════════════════════════════════════
+# On-disk cache of the tokens and AST of the programs that were already lexed and parsed, so running
+# the same source again can skip the front end (see run_lolcode()).
+# An entry is keyed by the hash of the source and of the front end's own code (the modules of
+# FRONT_END_PACKAGES), so editing the lexer or the parser never reuses an entry it didn't make.
+# Each entry is a file with a header (MAGIC and FORMAT_VERSION) followed by the TokenStream columns
+# and the FlatAST of the program. Entries are written to a temporary file and then renamed, so a
+# reader never sees a partial entry, and the least recently used ones are removed when the cache
+# gets bigger than max_size bytes.
+MAGIC = b'LOLC'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('>4sH')
+ENTRY_SUFFIX = '.lolc'
+
+DEFAULT_MAX_SIZE = 64 << 20
+FRONT_END_PACKAGES = ('lexer', 'parser')
+
+# Function to get the default cache directory ($LOLCODE_CACHE_DIR, or ~/.cache/lolcode)
+def default_cache_directory():
+  return os.environ.get('LOLCODE_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'lolcode')
+
+# Function to hash the code of the front end (the part of the key that changes with the interpreter's version)
+def front_end_version():
+  root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  version = hashlib.sha256(f'{FORMAT_VERSION} {sys.byteorder}'.encode())
+
+  for package in FRONT_END_PACKAGES:
+    directory = os.path.join(root, package)
+    for file_name in sorted(os.listdir(directory)):
+      if file_name.endswith('.py'):
+        with open(os.path.join(directory, file_name), 'rb') as file:
+          version.update(file_name.encode())
+          version.update(file.read())
+
+  return version.digest()
+
+class ParseCache:
+  def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+    self.directory = directory if directory is not None else default_cache_directory()
+    self.max_size = max_size
+    self.version = front_end_version()
+
+  def key(self, source):
+    return hashlib.sha256(self.version + source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+  def path(self, source):
+    return os.path.join(self.directory, self.key(source) + ENTRY_SUFFIX)
+
+  # Function to get the cached (tokens, program node) of a source
+  # Returns None if the source isn't cached (or its entry can't be read).
+  def load(self, source):
+    path = self.path(source)
+    try:
+      with open(path, 'rb') as file:
+        data = file.read()
+    except OSError:
+      return None
+
+    try:
+      magic, format_version = HEADER.unpack_from(data)
+      if magic != MAGIC or format_version != FORMAT_VERSION:
+        return None
+
+      tags, starts, ends, lines, flat_ast = marshal.loads(data[HEADER.size:])
+      tokens = TokenStream(source)
+      tokens.tags.frombytes(tags)
+      tokens.starts.frombytes(starts)
+      tokens.ends.frombytes(ends)
+      tokens.lines.frombytes(lines)
+      program = FlatAST.from_bytes(flat_ast).to_node()
+    except (struct.error, ValueError, EOFError, TypeError, IndexError):
+      return None   # Damaged entry (it's replaced by the next store())
+
+    # Mark the entry as recently used
+    try:
+      os.utime(path)
+    except OSError:
+      pass
+
+    return tokens, program
+
+  # Function to cache the tokens (a TokenStream of the source) and program node of a source
+  # Caching is only an optimization, so an entry that can't be written is skipped.
+  def store(self, source, tokens, program):
+    if not isinstance(tokens, TokenStream) or tokens.encoding is not None:
+      return
+
+    data = HEADER.pack(MAGIC, FORMAT_VERSION) + marshal.dumps((
+      tokens.tags.tobytes(), tokens.starts.tobytes(), tokens.ends.tobytes(), tokens.lines.tobytes(),
+      FlatAST.from_node(program).to_bytes(),
+    ))
+
+    try:
+      os.makedirs(self.directory, exist_ok=True)
+      file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+      try:
+        with os.fdopen(file_descriptor, 'wb') as file:
+          file.write(data)
+        os.replace(temporary_path, self.path(source))
+      except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+      self.evict()
+    except OSError:
+      pass
+
+  # Function to remove the least recently used entries until the cache fits in max_size bytes
+  def evict(self):
+    entries = []
+    total_size = 0
+    for entry in os.scandir(self.directory):
+      if entry.name.endswith(ENTRY_SUFFIX):
+        try:
+          stat = entry.stat()
+        except OSError:
+          continue    # Removed by another process
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+      if total_size <= self.max_size:
+        break
+      try:
+        os.unlink(path)
+      except OSError:
+        pass
+      total_size -= size
+
+  # Function to remove every entry
+  def clear(self):
+    try:
+      for entry in os.scandir(self.directory):
+        if entry.name.endswith(ENTRY_SUFFIX):
+          os.unlink(entry.path)
+    except OSError:
+      pass
+
+  def __repr__(self):
+    return f"ParseCache({self.directory!r}, max_size={self.max_size})"